@@ -8,7 +8,6 @@ from __future__ import annotations
 
 import argparse
 import sys
-import traceback
 
 from m3u8_spider.config import (
     DEFAULT_CONCURRENT,
@@ -18,6 +17,7 @@ from m3u8_spider.config import (
     get_mysql_config,
 )
 from m3u8_spider.automation.auto_downloader import create_auto_downloader
+from m3u8_spider.database.manager import DatabaseManager
 from m3u8_spider.logger import get_logger
 
 # 初始化 logger
@@ -54,6 +54,8 @@ def parse_args() -> argparse.Namespace:
   python -m cli.daemon
   python -m cli.daemon --concurrent 64 --delay 0.5
   python -m cli.daemon --check-interval 30
+  python -m cli.daemon --concurrent-tasks 3
+  python -m cli.daemon --ensure-indexes
 
 说明:
   - 守护进程会持续运行，从数据库读取待下载任务
@@ -81,9 +83,37 @@ def parse_args() -> argparse.Namespace:
         type=int,
         help=f"下载完成后的冷却时间（秒）（默认: 从配置文件读取，或 {DOWNLOAD_COOLDOWN_SECONDS}）",
     )
+    parser.add_argument(
+        "--concurrent-tasks",
+        type=int,
+        default=1,
+        help="同时处理的任务数（默认: 1，即逐个处理）",
+    )
+    parser.add_argument(
+        "--ensure-indexes",
+        action="store_true",
+        help="为 movie_info 创建守护进程查询所需的索引后退出（一次性迁移，需要 ALTER 权限）",
+    )
     return parser.parse_args()
 
 
+def ensure_indexes(config: dict) -> bool:
+    """连接数据库并创建缺失的索引（--ensure-indexes）"""
+    db_manager = DatabaseManager(
+        host=config["MYSQL_HOST"],
+        port=config["MYSQL_PORT"],
+        user=config["MYSQL_USER"],
+        password=config["MYSQL_PASSWORD"],
+        database=config["MYSQL_DATABASE"],
+    )
+    if not db_manager.connect():
+        return False
+    try:
+        return db_manager.ensure_indexes()
+    finally:
+        db_manager.close()
+
+
 # ---------------------------------------------------------------------------
 # 主入口
 # ---------------------------------------------------------------------------
@@ -106,6 +136,9 @@ def main() -> None:
         logger.error(f"\n❌ 配置加载失败: {e}")
         sys.exit(1)
 
+    if args.ensure_indexes:
+        sys.exit(0 if ensure_indexes(config) else 1)
+
     # 命令行参数覆盖配置文件
     concurrent = (
         args.concurrent if args.concurrent is not None else config["DEFAULT_CONCURRENT"]
@@ -134,6 +167,7 @@ def main() -> None:
             concurrent=concurrent,
             delay=delay,
             cooldown_seconds=cooldown_seconds,
+            concurrent_tasks=max(1, args.concurrent_tasks),
         )
         downloader.run()
     except KeyboardInterrupt:
@@ -141,7 +175,6 @@ def main() -> None:
         sys.exit(0)
     except Exception as e:
         logger.exception(f"\n❌ 发生错误: {e}")
-        traceback.print_exc()
         sys.exit(1)
 
 
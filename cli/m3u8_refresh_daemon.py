@@ -8,7 +8,6 @@ from __future__ import annotations
 
 import argparse
 import sys
-import traceback
 
 from m3u8_spider.config import (
     M3U8_REFRESH_INTERVAL,
@@ -109,7 +108,6 @@ def main() -> None:
         sys.exit(1)
     except Exception as e:
         logger.exception(f"\n❌ 发生错误: {e}")
-        traceback.print_exc()
         sys.exit(1)
 
 
@@ -8,29 +8,70 @@ from __future__ import annotations
 
 import signal
 import sys
-import time
-import traceback
-from dataclasses import dataclass
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from m3u8_spider.config import (
     DEFAULT_CONCURRENT,
     DEFAULT_DELAY,
     DOWNLOAD_COOLDOWN_SECONDS,
-    INVALID_FILENAME_CHARS,
+    INVALID_FILENAME_TRANS,
     MYSQL_CONNECT_TIMEOUT,
     MYSQL_READ_TIMEOUT,
     MYSQL_WRITE_TIMEOUT,
 )
-from m3u8_spider.database.manager import DatabaseManager, DownloadTask, TaskStatus
-from m3u8_spider.logger import get_logger
-from m3u8_spider.core.recovery import recover_download
-from m3u8_spider.core.downloader import DownloadConfig
-from tqdm import tqdm
+from m3u8_spider.database.manager import (
+    STATUS_STAT_KEYS,
+    DatabaseManager,
+    DownloadTask,
+    TaskStatus,
+)
+from m3u8_spider.logger import get_logger, shutdown_logging
+from m3u8_spider.core.recovery import prefetch_metadata, recover_download
+from m3u8_spider.core.downloader import DownloadConfig, kill_running_scrapy
 
 # 初始化 logger
 logger = get_logger(__name__)
 
+# 项目根目录：模块加载时解析一次
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# 忙碌时每隔多少轮才重新查询一次数据库统计（其余轮次在本地累加）
+_STATS_REFRESH_ITERATIONS = 10
+
+# 多行横幅模板：整块一次 logger 调用输出
+_SEP = "=" * 60
+_CONFIG_BANNER_TMPL = (
+    f"\n{_SEP}\n配置信息\n{_SEP}\n"
+    "数据库: %s:%s/%s\n"
+    "检查间隔: %s 秒\n"
+    "并发数: %s\n"
+    "下载延迟: %s 秒\n"
+    "批次大小: %s\n"
+    "并行任务数: %s\n"
+    "冷却时间: %s 秒\n"
+    f"{_SEP}\n"
+)
+_TASK_BANNER_TMPL = (
+    f"\n{_SEP}\n📥 开始处理任务\n{_SEP}\n"
+    "ID: %s\n"
+    "编号: %s\n"
+    "标题: %s\n"
+    "提供商: %s\n"
+    "M3U8: %s\n"
+    f"{_SEP}\n"
+)
+_SUMMARY_TMPL = (
+    f"\n{_SEP}\n📊 下载统计\n{_SEP}\n"
+    "总处理数: %s\n"
+    "成功: %s\n"
+    "失败: %s\n"
+    "%s"  # 成功率行（无任务时为空）
+    f"{_SEP}\n"
+)
+
 
 # ---------------------------------------------------------------------------
 # 数据模型
@@ -50,6 +91,7 @@ class AutoDownloadConfig:
     concurrent: int = DEFAULT_CONCURRENT
     delay: float = DEFAULT_DELAY
     batch_size: int = 1  # 每次处理的任务数
+    concurrent_tasks: int = 1  # 同时处理的任务数（线程池大小）
     cooldown_seconds: int = DOWNLOAD_COOLDOWN_SECONDS  # 下载完成后的冷却时间（秒）
 
 
@@ -60,30 +102,36 @@ class DownloadStats:
     total_processed: int = 0
     success_count: int = 0
     failed_count: int = 0
+    # 多个任务线程并发更新计数，需加锁
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
 
     def record_success(self) -> None:
         """记录成功"""
-        self.total_processed += 1
-        self.success_count += 1
+        with self._lock:
+            self.total_processed += 1
+            self.success_count += 1
 
     def record_failure(self) -> None:
         """记录失败"""
-        self.total_processed += 1
-        self.failed_count += 1
+        with self._lock:
+            self.total_processed += 1
+            self.failed_count += 1
 
     def print_summary(self) -> None:
         """打印统计摘要"""
-        sep = "=" * 60
-        logger.info(f"\n{sep}")
-        logger.info("📊 下载统计")
-        logger.info(sep)
-        logger.info(f"总处理数: {self.total_processed}")
-        logger.info(f"成功: {self.success_count}")
-        logger.info(f"失败: {self.failed_count}")
+        rate_line = ""
         if self.total_processed > 0:
             success_rate = (self.success_count / self.total_processed) * 100
-            logger.info(f"成功率: {success_rate:.1f}%")
-        logger.info(f"{sep}\n")
+            rate_line = f"成功率: {success_rate:.1f}%\n"
+        logger.info(
+            _SUMMARY_TMPL,
+            self.total_processed,
+            self.success_count,
+            self.failed_count,
+            rate_line,
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -111,7 +159,17 @@ class AutoDownloader:
         )
         self._stats = DownloadStats()
         self._running = True
-        self._project_root = Path(__file__).resolve().parent.parent.parent
+        # 停止事件：等待/倒计时阻塞在 Event.wait 上，收到信号即刻返回
+        self._stop_event = threading.Event()
+        self._project_root = _PROJECT_ROOT
+        # 元数据预取：单线程后台补齐下一批任务的元数据，按任务 ID 去重
+        self._prefetch_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="metadata-prefetch"
+        )
+        self._prefetch_futures: dict[int, Future] = {}
+        # 当前批次的下载线程池；强制退出时不等待其中任务跑完
+        self._batch_pool: ThreadPoolExecutor | None = None
+        self._force_exit = False
 
         # 注册信号处理器
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -123,11 +181,24 @@ class AutoDownloader:
         if self._running:
             logger.warning("\n\n⚠️  收到中断信号，正在优雅退出...")
             self._running = False
+            self._stop_event.set()
         else:
             # 第二次收到信号：强制退出
             logger.error("\n\n⚠️  再次收到中断信号，强制退出...")
+            self._abort_downloads()
             sys.exit(1)
 
+    def _abort_downloads(self) -> None:
+        """强制退出：终止所有 scrapy 子进程，取消排队任务，且不等待工作线程"""
+        self._force_exit = True
+        killed = kill_running_scrapy()
+        if killed:
+            logger.error("已终止 %s 个 scrapy 子进程", killed)
+        pool = self._batch_pool
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+
     def run(self) -> None:
         """主循环：守护进程模式"""
         logger.info("🚀 自动下载器启动")
@@ -139,89 +210,201 @@ class AutoDownloader:
 
         try:
             self._main_loop()
-        except Exception as e:
-            logger.exception(f"❌ 发生未预期的错误: {e}")
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ 发生未预期的错误")
         finally:
             self._cleanup()
 
     def _print_config(self) -> None:
         """打印配置信息"""
-        sep = "=" * 60
-        logger.info(f"\n{sep}")
-        logger.info("配置信息")
-        logger.info(sep)
+        cfg = self._config
         logger.info(
-            f"数据库: {self._config.db_host}:{self._config.db_port}/{self._config.db_database}"
+            _CONFIG_BANNER_TMPL,
+            cfg.db_host,
+            cfg.db_port,
+            cfg.db_database,
+            cfg.check_interval,
+            cfg.concurrent,
+            cfg.delay,
+            cfg.batch_size,
+            cfg.concurrent_tasks,
+            cfg.cooldown_seconds,
         )
-        logger.info(f"检查间隔: {self._config.check_interval} 秒")
-        logger.info(f"并发数: {self._config.concurrent}")
-        logger.info(f"下载延迟: {self._config.delay} 秒")
-        logger.info(f"批次大小: {self._config.batch_size}")
-        logger.info(f"冷却时间: {self._config.cooldown_seconds} 秒")
-        logger.info(f"{sep}\n")
 
     def _main_loop(self) -> None:
         """主循环：持续检查并处理任务"""
+        # 批次至少要能填满线程池；多取一批作为下一批，提前预取其元数据
+        limit = max(self._config.batch_size, self._config.concurrent_tasks)
+        fetch_limit = limit * 2
+        db_stats: dict[str, int] | None = None
+        iters_since_stats = 0
         while self._running:
-            # 获取数据库统计
-            db_stats = self._db_manager.get_statistics()
+            tasks: list[DownloadTask] = []
+            if (
+                db_stats is not None
+                and db_stats["pending"] > 0
+                and iters_since_stats < _STATS_REFRESH_ITERATIONS
+            ):
+                # 忙碌期间沿用本地维护的统计，只查询待下载任务
+                tasks = self._db_manager.get_pending_tasks(limit=fetch_limit)
+            if not tasks:
+                # 首轮、每 K 轮、本地计数已归零或本轮取不到任务时：重新获取统计与待下载任务
+                db_stats, tasks = self._db_manager.fetch_stats_and_pending(
+                    limit=fetch_limit
+                )
+                iters_since_stats = 0
+            iters_since_stats += 1
             logger.info(
-                f"\n📊 数据库状态: 总计={db_stats['total']}, "
-                f"待下载={db_stats['pending']}, "
-                f"成功={db_stats['success']}, "
-                f"失败={db_stats['failed']}"
+                "\n📊 数据库状态: 总计=%s, 待下载=%s, 成功=%s, 失败=%s",
+                db_stats["total"],
+                db_stats["pending"],
+                db_stats["success"],
+                db_stats["failed"],
             )
 
-            # 检查是否有待下载任务
-            if db_stats["pending"] == 0:
-                logger.info(
-                    f"✅ 没有待下载任务，{self._config.check_interval} 秒后再次检查..."
-                )
-                self._sleep_with_interrupt(self._config.check_interval)
-                continue
-
-            # 获取待下载任务
-            tasks = self._db_manager.get_pending_tasks(limit=self._config.batch_size)
+            # 以实际取到的任务判断是否空闲；本地统计只用于展示
             if not tasks:
-                logger.warning(
-                    f"⚠️  未能获取任务，{self._config.check_interval} 秒后重试..."
-                )
+                if db_stats["pending"] == 0:
+                    logger.info(
+                        "✅ 没有待下载任务，%s 秒后再次检查...", self._config.check_interval
+                    )
+                else:
+                    logger.warning(
+                        "⚠️  未能获取任务，%s 秒后重试...", self._config.check_interval
+                    )
                 self._sleep_with_interrupt(self._config.check_interval)
                 continue
 
-            # 处理每个任务
-            has_cooldown = False
-            for task in tasks:
-                if not self._running:
-                    logger.warning("⚠️  收到停止信号，中断任务处理")
-                    break
+            # 本批之后的任务（下一批）在后台预取元数据，隐藏其网络延迟
+            tasks, upcoming = tasks[:limit], tasks[limit:]
+            self._schedule_prefetch(upcoming)
 
-                self._process_task(task)
+            # 每个任务完成即写库，进程中途被杀也不会丢失本批已完成任务的状态
+            status_updates: list[tuple[int, TaskStatus, bool]] = []
+            try:
+                self._run_batch(tasks, status_updates)
+            finally:
+                _apply_status_updates(db_stats, status_updates)
 
-                # 任务完成后倒计时（仅在有更多任务或将要循环检查时）
-                if self._running and self._config.cooldown_seconds > 0:
-                    self._countdown_with_progress(
-                        self._config.cooldown_seconds, "任务完成，冷却倒计时"
-                    )
-                    has_cooldown = True
+            # 整批完成后倒计时（每批一次，而非每个任务一次）
+            has_cooldown = False
+            if self._running and self._config.cooldown_seconds > 0:
+                self._countdown_with_progress(
+                    self._config.cooldown_seconds, "任务完成，冷却倒计时"
+                )
+                has_cooldown = True
 
             # 如果已经执行了冷却倒计时，则直接进入下一轮检查，不再额外等待
             # 只有在没有冷却时间时，才使用 check_interval 作为任务之间的间隔
             if self._running and not has_cooldown:
-                logger.info(f"\n⏳ 等待 {self._config.check_interval} 秒后继续...")
+                logger.info("\n⏳ 等待 %s 秒后继续...", self._config.check_interval)
                 self._sleep_with_interrupt(self._config.check_interval)
 
+    def _run_batch(
+        self,
+        tasks: list[DownloadTask],
+        status_updates: list[tuple[int, TaskStatus, bool]],
+    ) -> None:
+        """
+        用有界线程池并行处理一批任务，完成一个收集一个结果
+
+        Args:
+            tasks: 本批任务
+            status_updates: 收集已写入数据库的状态结果（原地追加）
+        """
+        workers = max(1, min(self._config.concurrent_tasks, len(tasks)))
+        # 不用 with：强制退出时 SystemExit 会让 __exit__ 阻塞等待全部下载线程
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auto-download")
+        self._batch_pool = pool
+        try:
+            futures = [pool.submit(self._process_task_if_running, t) for t in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    self._write_status(result)
+                    status_updates.append(result)
+        finally:
+            self._batch_pool = None
+            # 异常/中断时取消尚未开始的任务；优雅退出时等待运行中的任务自然结束
+            pool.shutdown(wait=not self._force_exit, cancel_futures=True)
+
+    def _schedule_prefetch(self, tasks: list[DownloadTask]) -> None:
+        """在后台线程中提前补齐下一批任务的元数据，隐藏其网络延迟"""
+        # 丢弃已结束且不再排队的预取（任务可能已被其他进程处理）
+        wanted = {task.id for task in tasks}
+        stale = [
+            task_id
+            for task_id, future in self._prefetch_futures.items()
+            if task_id not in wanted and future.done()
+        ]
+        for task_id in stale:
+            del self._prefetch_futures[task_id]
+
+        for task in tasks:
+            if task.id in self._prefetch_futures:
+                continue
+            try:
+                config = self._build_download_config(task, console_log=False)
+            except ValueError as e:
+                # 配置无效（如 URL 非法）：不预取，留给 _process_task 标记失败
+                logger.warning("⚠️  跳过元数据预取 (ID=%s): %s", task.id, e)
+                continue
+            self._prefetch_futures[task.id] = self._prefetch_executor.submit(
+                prefetch_metadata, config
+            )
+
+    def _wait_prefetch(self, task: DownloadTask) -> None:
+        """等待该任务的元数据预取结束，避免与恢复流程同时写同一目录"""
+        future = self._prefetch_futures.pop(task.id, None)
+        if future is None or future.cancel():
+            return
+        try:
+            future.result()
+        except Exception as e:
+            # 预取失败不影响主流程，recover_download 会再次补齐
+            logger.warning("⚠️  元数据预取失败 (ID=%s): %s", task.id, e)
+
+    def _build_download_config(
+        self, task: DownloadTask, console_log: bool | None = None
+    ) -> DownloadConfig:
+        """
+        根据任务构建下载配置
+
+        Args:
+            task: 下载任务
+            console_log: 爬虫日志是否输出到控制台；None 时仅在逐个处理任务时输出，
+                         并行处理时只写日志文件，避免多路输出交错
+        """
+        if console_log is None:
+            console_log = self._config.concurrent_tasks <= 1
+        return DownloadConfig(
+            m3u8_url=task.m3u8_address,
+            filename=self._sanitize_filename(task.number),
+            concurrent=self._config.concurrent,
+            delay=self._config.delay,
+            console_log=console_log,
+            # 控制台输出经本进程 logger 转发，随守护进程日志一并落盘
+            forward_output=True,
+        )
+
+    def _process_task_if_running(
+        self, task: DownloadTask
+    ) -> tuple[int, TaskStatus, bool] | None:
+        """收到停止信号后不再开始新任务，返回 None"""
+        if not self._running:
+            logger.warning("⚠️  收到停止信号，跳过任务 (ID=%s)", task.id)
+            self._prefetch_futures.pop(task.id, None)
+            return None
+        return self._process_task(task)
+
     def _sleep_with_interrupt(self, seconds: int) -> None:
-        """可中断的睡眠"""
+        """可中断的睡眠：单次阻塞等待，停止事件触发时立即返回"""
         try:
-            for _ in range(seconds):
-                if not self._running:
-                    break
-                time.sleep(1)
+            self._stop_event.wait(timeout=seconds)
         except KeyboardInterrupt:
             # 如果用户在等待期间按 CTRL+C，立即退出
             self._running = False
+            self._stop_event.set()
             raise
 
     def _countdown_with_progress(
@@ -234,7 +417,10 @@ class AutoDownloader:
             seconds: 倒计时秒数
             description: 描述文字
         """
-        logger.info(f"\n⏱️  {description}: {seconds} 秒")
+        logger.info("\n⏱️  %s: %s 秒", description, seconds)
+
+        # 延迟导入：cooldown_seconds=0 时从不显示进度条，无需加载 tqdm
+        from tqdm import tqdm
 
         # 使用 tqdm 创建进度条
         try:
@@ -245,98 +431,93 @@ class AutoDownloader:
                 bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}秒 [{elapsed}<{remaining}]",
             ) as pbar:
                 for _ in range(seconds):
-                    if not self._running:
+                    # 每秒刷新一次进度条；停止事件触发时 wait 立即返回 True
+                    if self._stop_event.wait(timeout=1):
                         tqdm.write("⚠️  倒计时被中断")
                         break
-                    time.sleep(1)
                     pbar.update(1)
         except KeyboardInterrupt:
             # 如果用户在倒计时期间按 CTRL+C，立即退出
             tqdm.write("⚠️  倒计时被中断")
             self._running = False
+            self._stop_event.set()
             raise
 
         if self._running:
             logger.info("✅ 等待完成，继续下一个任务\n")
 
-    def _process_task(self, task: DownloadTask) -> None:
-        """处理单个下载任务"""
-        sep = "=" * 60
-        logger.info(f"\n{sep}")
-        logger.info("📥 开始处理任务")
-        logger.info(sep)
-        logger.info(f"ID: {task.id}")
-        logger.info(f"编号: {task.number}")
-        logger.info(f"标题: {task.title or 'N/A'}")
-        logger.info(f"提供商: {task.provider or 'N/A'}")
-        logger.info(f"M3U8: {task.m3u8_address}")
-        logger.info(f"{sep}\n")
+    def _write_status(self, update: tuple[int, TaskStatus, bool]) -> None:
+        """将单个任务的状态结果写入数据库"""
+        task_id, status, update_m3u8_time = update
+        logger.info("💾 正在写入数据库 (ID=%s, 状态=%s)...", task_id, status.name)
+        if self._db_manager.update_task_status(task_id, status, update_m3u8_time):
+            logger.info("✅ 已更新数据库状态")
+        else:
+            logger.error("❌ 写入数据库状态失败 (ID=%s)", task_id)
+
+    def _process_task(self, task: DownloadTask) -> tuple[int, TaskStatus, bool]:
+        """
+        处理单个下载任务
+
+        Returns:
+            待写入数据库的 (task_id, status, 是否更新 m3u8_update_time)
+        """
+        logger.info(
+            _TASK_BANNER_TMPL,
+            task.id,
+            task.number,
+            task.title or "N/A",
+            task.provider or "N/A",
+            task.m3u8_address,
+        )
 
         try:
-            # 1. 创建下载配置
-            filename = self._sanitize_filename(task.number)
-            download_config = DownloadConfig(
-                m3u8_url=task.m3u8_address,
-                filename=filename,
-                concurrent=self._config.concurrent,
-                delay=self._config.delay,
-            )
+            # 1. 创建下载配置，并等待可能在途的元数据预取
+            download_config = self._build_download_config(task)
+            filename = download_config.filename
+            self._wait_prefetch(task)
 
             # 2. 执行恢复流程（补元数据 -> 校验 -> 仅重下失败TS）
-            logger.info(f"⬇️  开始下载恢复流程: {filename}")
+            logger.info("⬇️  开始下载恢复流程: %s", filename)
             recovery_result = recover_download(download_config, max_retry_rounds=3)
             is_complete = recovery_result.is_complete
             result = recovery_result.validation_result
 
             # 3. 更新数据库状态
             if is_complete:
-                logger.info(f"✅ 校验通过: {filename}")
+                logger.info("✅ 校验通过: %s", filename)
                 if recovery_result.retry_rounds > 0:
-                    logger.info(f"   重试轮次: {recovery_result.retry_rounds}")
-                logger.info(
-                    f"💾 正在写入数据库 (task_id={task.id}, status=1)..."
-                )
-                self._db_manager.update_task_status(
-                    task.id, status=TaskStatus.SUCCESS, update_m3u8_time=True
-                )
+                    logger.info("   重试轮次: %s", recovery_result.retry_rounds)
                 self._stats.record_success()
-                logger.info("✅ 已更新数据库状态: status=1 (成功)")
+                return task.id, TaskStatus.SUCCESS, True
             else:
-                logger.error(f"❌ 校验失败: {filename}")
+                logger.error("❌ 校验失败: %s", filename)
                 failed_count = len(result.get("failed_files", []))
-                logger.error(f"   失败文件数: {failed_count}")
+                logger.error("   失败文件数: %s", failed_count)
                 logger.error("   已达到最大重试轮次: 3")
-                logger.info(
-                    f"💾 正在写入数据库 (task_id={task.id}, status=2)..."
-                )
-                self._db_manager.update_task_status(
-                    task.id, status=TaskStatus.FAILED, update_m3u8_time=True
-                )
                 self._stats.record_failure()
-                logger.warning("⚠️  已更新数据库状态: status=2 (失败)")
+                return task.id, TaskStatus.FAILED, True
 
-        except Exception as e:
-            logger.exception(f"❌ 处理任务失败 (ID={task.id}): {e}")
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ 处理任务失败 (ID=%s)", task.id)
 
-            # 更新为失败状态
-            self._db_manager.update_task_status(task.id, status=TaskStatus.FAILED)
+            # 标记为失败状态（异常失败不更新 m3u8_update_time）
             self._stats.record_failure()
-            logger.warning("⚠️  已更新数据库状态: status=2 (异常失败)")
+            return task.id, TaskStatus.FAILED, False
 
     def _sanitize_filename(self, filename: str) -> str:
         """清理文件名（移除不合法字符）"""
-        name = filename.strip()
-        for char in INVALID_FILENAME_CHARS:
-            name = name.replace(char, "_")
-        return name
+        return filename.strip().translate(INVALID_FILENAME_TRANS)
 
     def _cleanup(self) -> None:
         """清理资源"""
         logger.info("\n🧹 正在清理资源...")
+        self._prefetch_executor.shutdown(wait=not self._force_exit, cancel_futures=True)
+        self._prefetch_futures.clear()
         self._db_manager.close()
         self._stats.print_summary()
         logger.info("👋 自动下载器已退出")
+        shutdown_logging()
 
 
 # ---------------------------------------------------------------------------
@@ -344,6 +525,17 @@ class AutoDownloader:
 # ---------------------------------------------------------------------------
 
 
+def _apply_status_updates(
+    db_stats: dict[str, int], updates: list[tuple[int, TaskStatus, bool]]
+) -> None:
+    """将本批写入的任务状态累加到本地统计（待下载 → 成功/失败），免去重新查询"""
+    for _, status, _ in updates:
+        key = STATUS_STAT_KEYS.get(status)
+        if key and key != "pending":
+            db_stats["pending"] = max(0, db_stats["pending"] - 1)
+            db_stats[key] += 1
+
+
 def create_auto_downloader(
     db_host: str,
     db_port: int,
@@ -354,6 +546,7 @@ def create_auto_downloader(
     concurrent: int = DEFAULT_CONCURRENT,
     delay: float = DEFAULT_DELAY,
     cooldown_seconds: int = DOWNLOAD_COOLDOWN_SECONDS,
+    concurrent_tasks: int = 1,
 ) -> AutoDownloader:
     """
     创建自动下载器实例
@@ -368,6 +561,7 @@ def create_auto_downloader(
         concurrent: 并发数
         delay: 下载延迟（秒）
         cooldown_seconds: 下载完成后的冷却时间（秒）
+        concurrent_tasks: 同时处理的任务数
 
     Returns:
         AutoDownloader 实例
@@ -382,5 +576,6 @@ def create_auto_downloader(
         concurrent=concurrent,
         delay=delay,
         cooldown_seconds=cooldown_seconds,
+        concurrent_tasks=concurrent_tasks,
     )
     return AutoDownloader(config)
\ No newline at end of file
@@ -9,7 +9,6 @@ from __future__ import annotations
 import signal
 import sys
 import time
-import traceback
 from dataclasses import dataclass
 
 from m3u8_spider.config import (
@@ -123,7 +122,6 @@ class M3U8Refresher:
             self._main_loop()
         except Exception as e:
             logger.exception(f"❌ 发生未预期的错误: {e}")
-            traceback.print_exc()
         finally:
             self._cleanup()
 
@@ -63,9 +63,28 @@ LOG_DATE_FORMAT: str = "%Y-%m-%d %H:%M:%S"
 # ---------------------------------------------------------------------------
 
 INVALID_FILENAME_CHARS: str = '<>:"/\\|?*'
+# 非法字符 → "_" 的 str.translate 映射表（模块加载时构建一次）
+INVALID_FILENAME_TRANS: dict[int, str] = str.maketrans(
+    dict.fromkeys(INVALID_FILENAME_CHARS, "_")
+)
 DEFAULT_MP4_DIR: str = "mp4"
 
 
+# ---------------------------------------------------------------------------
+# 校验相关（可被环境变量覆盖）
+# ---------------------------------------------------------------------------
+
+# 并发 stat 的线程数；下载目录挂在 SMB/NFS 上时每次 stat 都是一次网络往返
+_DEFAULT_VALIDATE_WORKERS = 32
+VALIDATE_WORKERS: int = int(
+    os.getenv("M3U8_VALIDATE_WORKERS", str(_DEFAULT_VALIDATE_WORKERS))
+)
+# Linux 下用 statx(AT_STATX_DONT_SYNC) 读取大小，NFS/SMB 上跳过与服务器的元数据同步
+VALIDATE_DONT_SYNC: bool = (
+    os.getenv("M3U8_VALIDATE_DONT_SYNC", "").strip().lower() in {"1", "true", "yes", "on"}
+)
+
+
 # ---------------------------------------------------------------------------
 # 合并相关
 # ---------------------------------------------------------------------------
@@ -1,8 +1,17 @@
 """核心业务逻辑模块"""
 
-from m3u8_spider.core.downloader import DownloadConfig, run_scrapy
+from m3u8_spider.core.downloader import (
+    DownloadConfig,
+    kill_running_scrapy,
+    run_scrapy,
+    run_scrapy_async,
+)
 from m3u8_spider.core.m3u8_fetcher import find_m3u8_url, fetch_m3u8_from_page
-from m3u8_spider.core.recovery import recover_download, RecoveryResult
+from m3u8_spider.core.recovery import (
+    prefetch_metadata,
+    recover_download,
+    RecoveryResult,
+)
 from m3u8_spider.core.validator import (
     validate_downloads,
     DownloadValidator,
@@ -12,9 +21,12 @@ from m3u8_spider.core.validator import (
 __all__ = [
     "DownloadConfig",
     "run_scrapy",
+    "run_scrapy_async",
+    "kill_running_scrapy",
     "find_m3u8_url",
     "fetch_m3u8_from_page",
     "recover_download",
+    "prefetch_metadata",
     "RecoveryResult",
     "validate_downloads",
     "DownloadValidator",
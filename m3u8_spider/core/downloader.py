@@ -6,23 +6,28 @@ Scrapy 管理模块
 
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
+import logging
+import os
+import shlex
 import subprocess
 import sys
 import tempfile
-from base64 import urlsafe_b64encode
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from m3u8_spider.config import (
     DEFAULT_BASE_DIR,
     DEFAULT_CONCURRENT,
     DEFAULT_DELAY,
-    INVALID_FILENAME_CHARS,
+    INVALID_FILENAME_TRANS,
     LOGS_DIR,
 )
 
 from m3u8_spider.logger import get_logger
+from m3u8_spider.utils.jsonfast import json_dumpb
 
 # 初始化 logger
 logger = get_logger(__name__)
@@ -30,13 +35,27 @@ logger = get_logger(__name__)
 # 超过此长度的 retry_urls JSON 改写入临时文件，避免 subprocess「参数列表过长」(ARG_MAX)
 _MAX_RETRY_URLS_JSON_BYTES = 48_000
 
+# 异步模式转发子进程输出：每次读取的块大小，以及单行的最大长度（超长行按此截断分段输出）
+_OUTPUT_READ_SIZE = 64 * 1024
+_OUTPUT_LINE_LIMIT = 1024 * 1024
+
+# 合法的 m3u8_url 前缀
+_URL_PREFIXES = ("http://", "https://")
+
+# Twisted 线程池下限（与 scrapy_project settings 中的默认值一致），并发更高时随之放大
+_MIN_REACTOR_THREADPOOL_SIZE = 40
+
+# 项目根目录（m3u8_spider 包的父目录）；resolve() 逐级 stat，只在导入时计算一次
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+_SCRAPY_PROJECT_DIR = _PROJECT_ROOT / "scrapy_project"
+
 
 # ---------------------------------------------------------------------------
 # 数据模型
 # ---------------------------------------------------------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DownloadConfig:
     """
     M3U8 下载配置（不可变）
@@ -47,6 +66,12 @@ class DownloadConfig:
         concurrent: 并发下载数
         delay: 下载延迟（秒）
         metadata_only: 仅下载/补齐元数据文件（playlist、加密信息、密钥、content_lengths）
+        console_log: 爬虫日志是否输出到控制台（同时写日志文件）。
+                     为 False 时子进程 stdout/stderr 直接重定向到日志文件，
+                     多个下载并行时不再争用父进程终端
+        forward_output: 仅 console_log 为 True 时有效。为 True 时经管道读取子进程输出、
+                        逐行转发到本进程 logger（守护进程使用，输出进入其日志）；
+                        为 False 时子进程直接继承终端，Scrapy 日志原样输出
         retry_urls: 重试模式参数（可选）。
                    如果提供此参数，spider 将跳过 M3U8 解析，直接下载指定的视频片段。
                    每个字典应包含：
@@ -66,66 +91,92 @@ class DownloadConfig:
     concurrent: int = DEFAULT_CONCURRENT
     delay: float = DEFAULT_DELAY
     metadata_only: bool = False
+    console_log: bool = True
+    forward_output: bool = False
     retry_urls: list[dict] | None = None  # 重试模式：直接下载指定的视频片段列表
+    # 派生值缓存：在 __post_init__ 中计算一次
+    _sanitized: str = field(default="", init=False, repr=False, compare=False)
+    _download_dir: Path | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self) -> None:
-        if not self.m3u8_url.startswith(("http://", "https://")):
+        if not self.m3u8_url.startswith(_URL_PREFIXES):
             raise ValueError(f"无效的URL: {self.m3u8_url}")
-        if not self.filename or not self.filename.strip():
+        # strip 一次，同时用于非空校验与文件名清理
+        stripped = self.filename.strip() if self.filename else ""
+        if not stripped:
             raise ValueError("文件名不能为空")
         if self.metadata_only and self.retry_urls:
             raise ValueError("metadata_only 与 retry_urls 不能同时启用")
 
+        sanitized = stripped.translate(INVALID_FILENAME_TRANS)
+        object.__setattr__(self, "_sanitized", sanitized)
+        object.__setattr__(
+            self, "_download_dir", _PROJECT_ROOT / DEFAULT_BASE_DIR / sanitized
+        )
+
     @property
     def sanitized_filename(self) -> str:
         """清理后的文件名（移除不合法字符）"""
-        name = self.filename.strip()
-        for char in INVALID_FILENAME_CHARS:
-            name = name.replace(char, "_")
-        return name
+        return self._sanitized
 
     @property
     def project_root(self) -> Path:
         """项目根目录（m3u8_spider 包的父目录）"""
-        return Path(__file__).resolve().parent.parent.parent
+        return _PROJECT_ROOT
 
     @property
     def scrapy_project_dir(self) -> Path:
         """Scrapy 项目目录"""
-        return self.project_root / "scrapy_project"
+        return _SCRAPY_PROJECT_DIR
 
     @property
     def download_dir(self) -> Path:
         """下载输出目录路径（默认在 movies/ 下）"""
-        return self.project_root / DEFAULT_BASE_DIR / self.sanitized_filename
+        return self._download_dir
 
 
 # ---------------------------------------------------------------------------
 # Scrapy 运行函数
 # ---------------------------------------------------------------------------
 
+# 已确保存在的公共目录（movies/、logs/），批量运行时不再逐级 stat/mkdir
+_ensured_dirs: set[Path] = set()
+_ensured_dirs_lock = threading.Lock()
 
-def run_scrapy(config: DownloadConfig) -> None:
-    """
-    使用 subprocess 调用 scrapy crawl 命令运行爬虫。
 
-    Args:
-        config: 下载配置
+def _ensure_dir(path: Path) -> None:
+    """确保目录存在；同一进程内每个目录只创建一次"""
+    with _ensured_dirs_lock:
+        if path in _ensured_dirs:
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(path)
 
-    注意：
-    - 使用 subprocess 调用 scrapy crawl 命令，支持标准的 Scrapy 命令行参数传递方式
-    - 通过 -a 参数传递 spider 参数
-    - 通过 -s 参数设置 Scrapy settings
+
+def _prepare_scrapy_command(
+    config: DownloadConfig,
+) -> tuple[list[str], str, Path | None]:
+    """
+    构建 scrapy crawl 命令行（run_scrapy / run_scrapy_async 共用）
+
+    Returns:
+        (命令参数列表, 日志文件路径, retry_urls 临时文件路径或 None；调用方负责清理)
     """
+    # 路径各计算并转为字符串一次，命令构建中复用
+    download_dir = config.download_dir
+    sanitized = config.sanitized_filename
+
     # 确保目录存在
-    config.download_dir.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(download_dir.parent)
     log_dir = config.project_root / LOGS_DIR
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / f"{config.sanitized_filename}.log"
+    _ensure_dir(log_dir)
+    log_file = os.fspath(log_dir / f"{sanitized}.log")
 
     # 构建 scrapy crawl 命令
-    # m3u8_url 通过 base64 传递，避免 URL 中的特殊字符影响 -a name=value 解析
-    m3u8_url_b64 = urlsafe_b64encode(config.m3u8_url.encode("utf-8")).decode("ascii")
+    # 参数以列表形式传给子进程（不经 shell），URL 原样传递即可；
+    # scrapy 按第一个 "=" 切分 -a name=value，URL 查询串中的 "=" 不受影响
     cmd = [
         sys.executable,
         "-m",
@@ -133,60 +184,192 @@ def run_scrapy(config: DownloadConfig) -> None:
         "crawl",
         "m3u8_downloader",
         "-a",
-        f"m3u8_url_b64={m3u8_url_b64}",
+        f"m3u8_url={config.m3u8_url}",
         "-a",
-        f"filename={config.sanitized_filename}",
+        f"filename={sanitized}",
         "-a",
-        f"download_directory={config.download_dir}",
+        f"download_directory={os.fspath(download_dir)}",
         "-s",
         f"CONCURRENT_REQUESTS={config.concurrent}",
+        # 片段通常来自同一 CDN 域名，按域名的并发上限需与全局并发一致，否则会被其封顶
         "-s",
-        f"DOWNLOAD_DELAY={config.delay}",
+        f"CONCURRENT_REQUESTS_PER_DOMAIN={config.concurrent}",
         "-s",
-        f"M3U8_LOG_FILE={log_file}",
+        f"REACTOR_THREADPOOL_MAXSIZE={max(_MIN_REACTOR_THREADPOOL_SIZE, config.concurrent)}",
+        "-s",
+        f"DOWNLOAD_DELAY={config.delay}",
     ]
+    # 控制台模式下由 M3U8FileLogExtension 另写日志文件；
+    # 否则子进程输出整体重定向到该文件，不再启用扩展以免重复写入
+    if config.console_log:
+        cmd.extend(["-s", f"M3U8_LOG_FILE={log_file}"])
 
     retry_urls_temp: Path | None = None
     # 如果存在 retry_urls，序列化后通过 -a 或临时文件传递（大列表避免 ARG_MAX）
     if config.retry_urls:
-        retry_urls_json = json.dumps(config.retry_urls)
-        if len(retry_urls_json.encode("utf-8")) > _MAX_RETRY_URLS_JSON_BYTES:
-            config.download_dir.mkdir(parents=True, exist_ok=True)
+        retry_urls_json = json_dumpb(config.retry_urls)
+        if len(retry_urls_json) > _MAX_RETRY_URLS_JSON_BYTES:
+            download_dir.mkdir(parents=True, exist_ok=True)
             with tempfile.NamedTemporaryFile(
-                mode="w",
-                encoding="utf-8",
+                mode="wb",
                 suffix=".json",
                 prefix="retry_urls_",
                 delete=False,
-                dir=config.download_dir,
+                dir=download_dir,
             ) as tmp:
                 tmp.write(retry_urls_json)
                 retry_urls_temp = Path(tmp.name)
             cmd.extend(["-a", f"retry_urls_file={retry_urls_temp}"])
         else:
-            cmd.extend(["-a", f"retry_urls={retry_urls_json}"])
+            cmd.extend(["-a", f"retry_urls={retry_urls_json.decode('utf-8')}"])
 
     if config.metadata_only:
         cmd.extend(["-a", "metadata_only=1"])
 
-    logger.info(f"执行命令: {' '.join(cmd)}")
-    logger.info(f"日志文件: {log_file}")
+    # shlex.join 生成可直接复制执行的命令；仅在 INFO 会输出时才拼接
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("执行命令: %s", shlex.join(cmd))
+    logger.info("日志文件: %s", log_file)
+    return cmd, log_file, retry_urls_temp
 
-    try:
-        # 在 scrapy_project 目录下运行命令
-        # 不捕获输出，让日志实时显示在控制台
-        # 同时通过 M3U8FileLogExtension 将日志写入文件（控制台+文件双输出）
-        subprocess.run(  # noqa: S603
-            cmd,
-            cwd=str(config.scrapy_project_dir),
-            check=True,
-            # 不捕获输出，确保日志实时显示在控制台
-            # Scrapy 的 M3U8FileLogExtension 会同时将日志写入文件
-            capture_output=False,
+
+def _child_output(config: DownloadConfig, log_file: str):
+    """
+    子进程输出目标：控制台模式下继承父进程终端（None）或经管道转发（PIPE），
+    否则追加写入日志文件
+    """
+    if config.console_log:
+        return contextlib.nullcontext(
+            asyncio.subprocess.PIPE if config.forward_output else None
         )
+    return open(log_file, "ab")
+
+
+def _remove_retry_urls_temp(retry_urls_temp: Path | None) -> None:
+    """删除 retry_urls 临时文件（若有）"""
+    if retry_urls_temp is None:
+        return
+    try:
+        retry_urls_temp.unlink(missing_ok=True)
+    except OSError:
+        logger.warning("无法删除临时 retry_urls 文件: %s", retry_urls_temp)
+
+
+def run_scrapy(config: DownloadConfig) -> None:
+    """
+    run_scrapy_async 的同步入口：在当前线程用 asyncio.run 跑完一次下载。
+
+    Args:
+        config: 下载配置
+
+    注意：
+    - 使用 subprocess 调用 scrapy crawl 命令，支持标准的 Scrapy 命令行参数传递方式
+    - 通过 -a 参数传递 spider 参数
+    - 通过 -s 参数设置 Scrapy settings
+    - 每个 AutoDownloader 工作线程各自运行一个事件循环；已在事件循环中的调用方应直接
+      await run_scrapy_async
+    """
+    asyncio.run(run_scrapy_async(config))
+
+
+# 运行中的 scrapy 子进程（跨工作线程登记），强制退出时统一终止；
+# 终止后不再启动新的子进程，避免重试轮次在退出过程中又拉起爬虫
+_running_procs: set[asyncio.subprocess.Process] = set()
+_running_procs_lock = threading.Lock()
+_spawn_blocked = False
+
+
+def kill_running_scrapy() -> int:
+    """
+    强制终止当前所有 scrapy 子进程，并阻止之后再启动新的子进程。
+
+    供守护进程二次中断（强制退出）时调用：工作线程里的 run_scrapy 随即返回，
+    线程池无需等待下载跑完。
+
+    Returns:
+        发出终止信号的子进程个数
+    """
+    global _spawn_blocked
+    with _running_procs_lock:
+        _spawn_blocked = True
+        procs = list(_running_procs)
+    killed = 0
+    for proc in procs:
+        if proc.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+                killed += 1
+    return killed
+
+
+def _register_proc(proc: asyncio.subprocess.Process) -> None:
+    """登记子进程；已强制退出时立即终止它"""
+    with _running_procs_lock:
+        if not _spawn_blocked:
+            _running_procs.add(proc)
+            return
+    with contextlib.suppress(ProcessLookupError):
+        proc.kill()
+
+
+def _log_output_line(line: bytes | bytearray) -> None:
+    logger.info("%s", line.decode("utf-8", errors="replace").rstrip())
+
+
+async def _forward_output(stream: asyncio.StreamReader) -> None:
+    """
+    按块读取子进程输出、按行转发到 logger，直至 EOF。
+    不用 readline/async for：超过 StreamReader limit 的行会抛 ValueError；
+    这里超过 _OUTPUT_LINE_LIMIT 仍无换行时直接分段输出。
+    """
+    buffer = bytearray()
+    while chunk := await stream.read(_OUTPUT_READ_SIZE):
+        buffer += chunk
+        *lines, rest = buffer.split(b"\n")
+        for line in lines:
+            _log_output_line(line)
+        buffer = bytearray(rest)
+        if len(buffer) >= _OUTPUT_LINE_LIMIT:
+            _log_output_line(buffer)
+            buffer.clear()
+    if buffer:
+        _log_output_line(buffer)
+
+
+async def run_scrapy_async(config: DownloadConfig) -> None:
+    """
+    使用 asyncio 子进程运行爬虫：由事件循环监督子进程，单线程即可并发运行多个下载。
+
+    Args:
+        config: 下载配置
+
+    Raises:
+        subprocess.CalledProcessError: scrapy 进程返回非零退出码
+    """
+    cmd, log_file, retry_urls_temp = _prepare_scrapy_command(config)
+    proc: asyncio.subprocess.Process | None = None
+    try:
+        with _child_output(config, log_file) as output:
+            # forward_output：经管道逐行转发到 logger，与守护进程自身日志按行完整输出、不交错
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=os.fspath(config.scrapy_project_dir),
+                stdout=output,
+                stderr=asyncio.subprocess.STDOUT if output is not None else None,
+            )
+            _register_proc(proc)
+            if proc.stdout is not None:
+                await _forward_output(proc.stdout)
+            returncode = await proc.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
     finally:
-        if retry_urls_temp is not None:
-            try:
-                retry_urls_temp.unlink(missing_ok=True)
-            except OSError:
-                logger.warning("无法删除临时 retry_urls 文件: %s", retry_urls_temp)
\ No newline at end of file
+        # 转发出错或被取消时不留下孤儿进程
+        if proc is not None and proc.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                proc.terminate()
+            await proc.wait()
+        if proc is not None:
+            with _running_procs_lock:
+                _running_procs.discard(proc)
+        _remove_retry_urls_temp(retry_urls_temp)
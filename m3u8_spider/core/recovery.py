@@ -8,7 +8,9 @@
 
 from __future__ import annotations
 
+import functools
 import json
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -48,24 +50,7 @@ def recover_download(config: DownloadConfig, max_retry_rounds: int = 3) -> Recov
         raise ValueError("recover_download 不接受 metadata_only 配置")
 
     download_dir = config.download_dir
-    download_dir.mkdir(parents=True, exist_ok=True)
-
-    missing_metadata = _collect_missing_metadata(download_dir)
-    metadata_downloaded = False
-
-    if missing_metadata:
-        logger.info(f"检测到缺失元数据文件: {', '.join(missing_metadata)}")
-        logger.info("开始补齐元数据文件...")
-        run_scrapy(
-            DownloadConfig(
-                m3u8_url=config.m3u8_url,
-                filename=config.filename,
-                concurrent=config.concurrent,
-                delay=config.delay,
-                metadata_only=True,
-            )
-        )
-        metadata_downloaded = True
+    metadata_downloaded = prefetch_metadata(config)
 
     _ensure_content_lengths_file(download_dir)
 
@@ -102,6 +87,8 @@ def recover_download(config: DownloadConfig, max_retry_rounds: int = 3) -> Recov
                 filename=config.filename,
                 concurrent=config.concurrent,
                 delay=config.delay,
+                console_log=config.console_log,
+                forward_output=config.forward_output,
                 retry_urls=retry_urls,
             )
         )
@@ -125,8 +112,42 @@ def recover_download(config: DownloadConfig, max_retry_rounds: int = 3) -> Recov
     )
 
 
+def prefetch_metadata(config: DownloadConfig) -> bool:
+    """
+    补齐关键元数据文件（playlist、加密信息、密钥、content_lengths）。
+    可在后台线程中提前调用，使后续 recover_download 直接跳过该步骤。
+
+    Returns:
+        是否实际执行了元数据下载
+    """
+    download_dir = config.download_dir
+    download_dir.mkdir(parents=True, exist_ok=True)
+
+    missing_metadata = _collect_missing_metadata(download_dir)
+    if not missing_metadata:
+        return False
+
+    logger.info(f"检测到缺失元数据文件: {', '.join(missing_metadata)}")
+    logger.info("开始补齐元数据文件...")
+    run_scrapy(
+        DownloadConfig(
+            m3u8_url=config.m3u8_url,
+            filename=config.filename,
+            concurrent=config.concurrent,
+            delay=config.delay,
+            console_log=config.console_log,
+            forward_output=config.forward_output,
+            metadata_only=True,
+        )
+    )
+    return True
+
+
 def _collect_missing_metadata(download_dir: Path) -> list[str]:
-    """收集缺失的关键元数据文件。"""
+    """
+    收集缺失的关键元数据文件。
+    encryption_info.json 仅在需要判断密钥是否缺失时才加载。
+    """
     missing: list[str] = []
 
     base_required = [CONTENT_LENGTHS_FILE, ENCRYPTION_INFO_FILE, PLAYLIST_FILE]
@@ -134,21 +155,33 @@ def _collect_missing_metadata(download_dir: Path) -> list[str]:
         if not (download_dir / filename).exists():
             missing.append(filename)
 
-    encryption_info = _load_encryption_info(download_dir)
-    if _requires_encryption_key(encryption_info) and not (
-        download_dir / ENCRYPTION_KEY_FILE
-    ).exists():
+    # 密钥文件已存在时无需解析 encryption_info.json
+    if (download_dir / ENCRYPTION_KEY_FILE).exists():
+        return missing
+
+    if _requires_encryption_key(_load_encryption_info(download_dir)):
         missing.append(ENCRYPTION_KEY_FILE)
 
     return missing
 
 
 def _load_encryption_info(download_dir: Path) -> dict:
-    """加载 encryption_info.json，异常时返回空字典。"""
+    """
+    加载 encryption_info.json，异常时返回空字典。
+    结果按 (路径, mtime_ns) 缓存，文件被 metadata-only 流程重写后自动失效；
+    返回的字典为共享缓存，调用方不应修改。
+    """
     path = download_dir / ENCRYPTION_INFO_FILE
-    if not path.exists():
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
         return {}
+    return _load_encryption_info_cached(str(path), mtime_ns)
 
+
+@functools.lru_cache(maxsize=128)
+def _load_encryption_info_cached(path: str, mtime_ns: int) -> dict:
+    """按 (路径, mtime_ns) 缓存解析结果；mtime_ns 仅参与缓存键。"""
     try:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -169,13 +202,19 @@ def _requires_encryption_key(encryption_info: dict) -> bool:
 
 
 def _ensure_content_lengths_file(download_dir: Path) -> None:
-    """若 content_lengths.json 缺失，创建空文件，避免后续流程反复缺失。"""
+    """
+    若 content_lengths.json 缺失，创建空文件，避免后续流程反复缺失。
+    O_CREAT|O_EXCL 原子创建：并发任务下不会覆盖已有内容，已存在时直接返回。
+    """
     path = download_dir / CONTENT_LENGTHS_FILE
-    if path.exists():
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
         return
-
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({}, f, ensure_ascii=False, indent=2)
+    try:
+        os.write(fd, b"{}")
+    finally:
+        os.close(fd)
 
 
 def _extract_failed_urls(validation_result: dict) -> dict[str, str]:
@@ -6,24 +6,41 @@ M3U8下载文件校验脚本
 
 from __future__ import annotations
 
+import argparse
+import ctypes
 import json
+import os
+import re
 import sys
+from collections.abc import Iterator, KeysView
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from m3u8_spider.logger import get_logger
+from m3u8_spider.config import VALIDATE_DONT_SYNC, VALIDATE_WORKERS
+from m3u8_spider.logger import get_logger, set_console_stream, shutdown_logging
 from m3u8_spider.utils.helpers import resolve_directory
+from m3u8_spider.utils.jsonfast import json_dumps, json_loads
 
 # 初始化 logger
 logger = get_logger(__name__)
 
+# playlist 中的片段行：去掉首尾空白后非空、不以 # 开头，且以 http 开头或包含 "."
+_SEGMENT_LINE_RE = re.compile(r"^[^\S\n]*(?!#)(?=http|[^\n]*\.)(\S(?:[^\n]*\S)?)", re.MULTILINE)
+
+# 流式解析 playlist 时每块读取的字符数（按整行切分）
+_PLAYLIST_BLOCK_SIZE = 1 << 20
+
+# 文件数低于该值时串行 stat，避免为小目录创建线程池
+_PARALLEL_STAT_MIN_FILES = 256
+
 
 # ---------------------------------------------------------------------------
 # 数据模型
 # ---------------------------------------------------------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SegmentInfo:
     """单个 M3U8 片段信息"""
 
@@ -35,6 +52,19 @@ class SegmentInfo:
         return f"SegmentInfo(index={self.index}, filename={self.expected_filename!r})"
 
 
+@dataclass(frozen=True, slots=True)
+class ParsedPlaylist:
+    """playlist 单次解析结果：片段列表 + 文件名 → URL 映射（同名片段后者覆盖前者）"""
+
+    segments: list[SegmentInfo]
+    filename_to_url: dict[str, str]
+
+    @property
+    def expected_names(self) -> KeysView[str]:
+        """预期文件名集合（dict 键视图，可直接与 set 做差集）"""
+        return self.filename_to_url.keys()
+
+
 @dataclass
 class ValidationResult:
     """校验结果：目录统计、缺失/空/不完整文件列表、是否通过"""
@@ -47,16 +77,22 @@ class ValidationResult:
     zero_size_files: list[str]
     incomplete_files: list[str]
     failed_urls: dict[str, str] = field(default_factory=dict)
+    # failed_files 的缓存；报告与 to_legacy_dict 会多次访问
+    _failed_files: list[str] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def failed_files(self) -> list[str]:
-        """所有失败文件（缺失 + 空 + 不完整）去重后排序"""
-        s = (
-            set(self.missing_files)
-            | set(self.zero_size_files)
-            | set(self.incomplete_files)
-        )
-        return sorted(s)
+        """所有失败文件（缺失 + 空 + 不完整）去重后排序（首次访问时计算）"""
+        if self._failed_files is None:
+            s = (
+                set(self.missing_files)
+                | set(self.zero_size_files)
+                | set(self.incomplete_files)
+            )
+            self._failed_files = sorted(s)
+        return self._failed_files
 
     @property
     def is_complete(self) -> bool:
@@ -94,41 +130,48 @@ class PlaylistParser:
 
     @staticmethod
     def parse(playlist_path: str) -> list[SegmentInfo]:
-        """解析 m3u8 文件，提取所有片段信息"""
-        segments: list[SegmentInfo] = []
-
-        if not Path(playlist_path).exists():
+        """解析 m3u8 文件，提取所有片段信息；文件不存在时记录错误并返回空列表"""
+        try:
+            return PlaylistParser.parse_playlist(playlist_path).segments
+        except FileNotFoundError:
             logger.error(f"错误: 找不到playlist.txt文件: {playlist_path}")
-            return segments
+            return []
 
-        content = PlaylistParser._read_file(playlist_path)
-        segment_index = 0
-
-        for line in content.strip().split("\n"):
-            line = line.strip()
-            # 跳过注释和空行
-            if not line or line.startswith("#"):
-                continue
+    @staticmethod
+    def parse_playlist(playlist_path: str) -> ParsedPlaylist:
+        """
+        解析 m3u8 文件，在同一次遍历中得到片段列表与文件名 → URL 映射。
+        不预先检查文件是否存在，打开失败时由 open() 抛出 FileNotFoundError。
+        """
+        segments: list[SegmentInfo] = []
+        filename_to_url: dict[str, str] = {}
 
-            # 如果是 URL
-            if line.startswith("http") or (not line.startswith("#") and "." in line):
-                filename = Path(line).name
-                if not filename or not filename.endswith(".ts"):
-                    filename = f"segment_{segment_index:05d}.ts"
+        # 由正则在 C 层完成逐行的空白裁剪与注释/空行过滤；按整行分块读取，不把整个文件载入内存
+        matches = (
+            match
+            for block in PlaylistParser._iter_line_blocks(playlist_path)
+            for match in _SEGMENT_LINE_RE.finditer(block)
+        )
+        for segment_index, match in enumerate(matches):
+            line = match.group(1)
+            # 纯字符串切分取末段，避免每行构造 Path 对象
+            filename = line.rstrip("/").rpartition("/")[2]
+            if not filename or not filename.endswith(".ts"):
+                filename = f"segment_{segment_index:05d}.ts"
 
-                segments.append(
-                    SegmentInfo(
-                        index=segment_index, url=line, expected_filename=filename
-                    )
-                )
-                segment_index += 1
+            segments.append(
+                SegmentInfo(index=segment_index, url=line, expected_filename=filename)
+            )
+            filename_to_url[filename] = line
 
-        return segments
+        return ParsedPlaylist(segments, filename_to_url)
 
     @staticmethod
-    def _read_file(path: str) -> str:
+    def _iter_line_blocks(path: str) -> Iterator[str]:
+        """以约 _PLAYLIST_BLOCK_SIZE 字符为单位产出由完整行拼成的文本块"""
         with open(path, "r", encoding="utf-8") as f:
-            return f.read()
+            while lines := f.readlines(_PLAYLIST_BLOCK_SIZE):
+                yield "".join(lines)
 
 
 class ContentLengthLoader:
@@ -150,11 +193,10 @@ class ContentLengthLoader:
             文件名到 Content-Length 的映射
         """
         path = Path(directory) / cls._FILENAME
-        if not path.exists():
-            return {}
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return json_loads(path.read_bytes())
+        except FileNotFoundError:
+            return {}
         except (json.JSONDecodeError, OSError):
             logger.exception("加载 content_lengths.json 失败")
             return {}
@@ -165,14 +207,6 @@ class ContentLengthLoader:
 # ---------------------------------------------------------------------------
 
 
-def _get_file_size(filepath: str) -> int:
-    """获取文件大小（字节）"""
-    try:
-        return Path(filepath).stat().st_size
-    except OSError:
-        return 0
-
-
 def _validate_content_length(actual_size: int, expected_length: int) -> bool:
     """校验实际文件大小与 Content-Length 是否一致（允许 1% 或 1KB 的余量）。"""
     if actual_size < expected_length:
@@ -183,6 +217,80 @@ def _validate_content_length(actual_size: int, expected_length: int) -> bool:
     return True
 
 
+# ---------------------------------------------------------------------------
+# statx(AT_STATX_DONT_SYNC)：仅 Linux（glibc >= 2.28），通过 ctypes 调用
+# ---------------------------------------------------------------------------
+
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_SIZE = 0x200
+_STATX_BUF_SIZE = 256  # sizeof(struct statx)
+_STATX_MASK_OFFSET = 0  # offsetof(struct statx, stx_mask)
+_STATX_SIZE_OFFSET = 40  # offsetof(struct statx, stx_size)
+
+
+def _load_statx():
+    """返回 libc 的 statx 函数；非 Linux 或 libc 不提供时返回 None。"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        statx = ctypes.CDLL(None, use_errno=True).statx
+    except (OSError, AttributeError):
+        return None
+    statx.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.c_void_p]
+    statx.restype = ctypes.c_int
+    return statx
+
+
+_statx = _load_statx() if VALIDATE_DONT_SYNC else None
+
+
+def _statx_size(dir_fd: int, entry: os.DirEntry) -> int:
+    """
+    用 statx 读取 dir_fd 下文件的大小，不强制与网络文件系统同步。
+    statx 失败（如被 seccomp 拦截返回 EPERM）或结果未包含大小时回退到 DirEntry.stat，
+    避免把所有片段误判为空文件。
+    """
+    buf = ctypes.create_string_buffer(_STATX_BUF_SIZE)
+    if _statx(dir_fd, os.fsencode(entry.name), _AT_STATX_DONT_SYNC, _STATX_SIZE, buf) != 0:
+        return _entry_size(entry)
+    raw = buf.raw
+    mask = int.from_bytes(raw[_STATX_MASK_OFFSET : _STATX_MASK_OFFSET + 4], sys.byteorder)
+    if not mask & _STATX_SIZE:
+        return _entry_size(entry)
+    return int.from_bytes(raw[_STATX_SIZE_OFFSET : _STATX_SIZE_OFFSET + 8], sys.byteorder)
+
+
+def _entry_size(entry: os.DirEntry) -> int:
+    """读取 DirEntry 的文件大小；stat 失败按 0 处理。"""
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return 0
+
+
+def _stat_sizes(directory: str, entries: list[os.DirEntry]) -> list[int]:
+    """
+    批量获取文件大小。文件较多时用线程池并发 stat：stat 系统调用释放 GIL，
+    在网络文件系统上可让多次往返相互重叠。
+    开启 M3U8_VALIDATE_DONT_SYNC 且平台支持时改用 statx(AT_STATX_DONT_SYNC)。
+    """
+    if _statx is None:
+        return _map_sizes(_entry_size, entries)
+    dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        return _map_sizes(lambda entry: _statx_size(dir_fd, entry), entries)
+    finally:
+        os.close(dir_fd)
+
+
+def _map_sizes(size_of, entries: list[os.DirEntry]) -> list[int]:
+    workers = min(VALIDATE_WORKERS, len(entries))
+    if workers <= 1 or len(entries) < _PARALLEL_STAT_MIN_FILES:
+        return [size_of(entry) for entry in entries]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(size_of, entries))
+
+
 class DownloadValidator:
     """
     校验下载目录：解析 playlist、统计 ts 文件、对比 Content-Length，
@@ -191,35 +299,41 @@ class DownloadValidator:
 
     def __init__(self, directory: str) -> None:
         self._directory = str(Path(directory).resolve())
+        # 最近一次 validate() 返回 None 的原因
+        self.error: str | None = None
 
     def validate(self) -> ValidationResult | None:
         """
-        执行校验。若目录无效或缺少 playlist 则打印错误并返回 None。
+        执行校验。若目录无效或缺少 playlist 则打印错误、记录到 self.error 并返回 None。
         否则返回 ValidationResult。
         """
-        if not self._ensure_directory():
-            return None
-
+        self.error = None
+        # 不做 isdir/exists 预检：直接打开 playlist，失败时再区分是目录还是文件缺失
         playlist_path = Path(self._directory) / "playlist.txt"
-        if not playlist_path.exists():
-            logger.error(f"错误: 找不到playlist.txt文件: {playlist_path}")
+        try:
+            playlist = PlaylistParser.parse_playlist(str(playlist_path))
+        except (FileNotFoundError, NotADirectoryError):
+            if Path(self._directory).is_dir():
+                self.error = f"找不到playlist.txt文件: {playlist_path}"
+            else:
+                self.error = f"目录不存在: {self._directory}"
+            logger.error(f"错误: {self.error}")
             return None
 
-        expected_segments = PlaylistParser.parse(playlist_path)
         content_lengths = ContentLengthLoader.load(self._directory)
-        ts_files = self._collect_ts_files()
-
-        file_sizes, total_size = self._compute_file_sizes(ts_files)
-        missing = self._missing_filenames(expected_segments, ts_files)
-        zero_size, incomplete = self._check_sizes(ts_files, file_sizes, content_lengths)
+        actual_names, total_size, zero_size, incomplete = self._scan_ts_files(
+            content_lengths
+        )
+        missing = list(playlist.expected_names - actual_names)
+        # 三类失败文件名一次性并入同一个集合，供 URL 查表
         failed_urls = self._build_failed_urls(
-            expected_segments, missing, zero_size, incomplete
+            playlist.filename_to_url, {*missing, *zero_size, *incomplete}
         )
 
         result = ValidationResult(
             directory=self._directory,
-            expected_count=len(expected_segments),
-            actual_count=len(ts_files),
+            expected_count=len(playlist.segments),
+            actual_count=len(actual_names),
             total_size=total_size,
             missing_files=missing,
             zero_size_files=zero_size,
@@ -228,66 +342,48 @@ class DownloadValidator:
         )
         return result
 
-    def _ensure_directory(self) -> bool:
-        if not Path(self._directory).is_dir():
-            logger.error(f"错误: 目录不存在: {self._directory}")
-            return False
-        return True
-
-    def _collect_ts_files(self) -> list[str]:
-        files = []
-        for p in Path(self._directory).iterdir():
-            if p.suffix == ".ts" and p.is_file():
-                files.append(p.name)
-        return files
-
-    def _compute_file_sizes(self, ts_files: list[str]) -> tuple[dict[str, int], int]:
-        file_sizes: dict[str, int] = {}
-        total = 0
-        for name in ts_files:
-            path = Path(self._directory) / name
-            size = _get_file_size(str(path))
-            file_sizes[name] = size
-            total += size
-        return file_sizes, total
-
-    def _missing_filenames(
-        self, expected_segments: list[SegmentInfo], ts_files: list[str]
-    ) -> list[str]:
-        expected_names = {seg.expected_filename for seg in expected_segments}
-        actual_names = set(ts_files)
-        return list(expected_names - actual_names)
-
-    def _check_sizes(
-        self,
-        ts_files: list[str],
-        file_sizes: dict[str, int],
-        content_lengths: dict[str, int],
-    ) -> tuple[list[str], list[str]]:
-        zero_size: list[str] = []
+    def _scan_ts_files(
+        self, content_lengths: dict[str, int]
+    ) -> tuple[set[str], int, list[str], list[str]]:
+        """
+        单次 scandir 遍历收集 .ts 条目，并发 stat 后累加总大小、判定空文件与不完整文件。
+        DirEntry 自带 d_type，is_file 无需额外 stat。
+
+        Returns:
+            (实际文件名集合, 总大小, 空文件列表, 不完整文件列表)；两个列表按文件名排序
+        """
+        with os.scandir(self._directory) as entries:
+            ts_entries = [e for e in entries if e.name.endswith(".ts") and e.is_file()]
+        names = [e.name for e in ts_entries]
+        sizes = _stat_sizes(self._directory, ts_entries)
+        total_size = sum(sizes)
         incomplete: list[str] = []
-        for name in sorted(ts_files):
-            size = file_sizes[name]
-            if size == 0:
-                zero_size.append(name)
-            elif name in content_lengths:
-                if not _validate_content_length(size, content_lengths[name]):
+
+        if not content_lengths:
+            # 没有 content_lengths.json（旧下载常见）：只需挑出空文件
+            zero_size = [name for name, size in zip(names, sizes, strict=True) if not size]
+        else:
+            zero_size = []
+            for name, size in zip(names, sizes, strict=True):
+                if size == 0:
+                    zero_size.append(name)
+                elif name in content_lengths and not _validate_content_length(
+                    size, content_lengths[name]
+                ):
                     incomplete.append(name)
-        return zero_size, incomplete
+        # scandir 顺序不确定，只对（通常很短的）失败列表排序
+        zero_size.sort()
+        incomplete.sort()
+        return set(names), total_size, zero_size, incomplete
 
     def _build_failed_urls(
         self,
-        expected_segments: list[SegmentInfo],
-        missing: list[str],
-        zero_size: list[str],
-        incomplete: list[str],
+        filename_to_url: dict[str, str],
+        failed_names: set[str],
     ) -> dict[str, str]:
-        filename_to_url = {seg.expected_filename: seg.url for seg in expected_segments}
-        failed_set = set(missing) | set(zero_size) | set(incomplete)
+        # 映射在解析 playlist 时已建好，这里只为失败文件查表
         return {
-            name: filename_to_url[name]
-            for name in failed_set
-            if name in filename_to_url
+            name: filename_to_url[name] for name in failed_names if name in filename_to_url
         }
 
 
@@ -296,39 +392,48 @@ class DownloadValidator:
 # ---------------------------------------------------------------------------
 
 
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 def format_size(size_bytes: int) -> str:
-    """格式化文件大小"""
-    val = float(size_bytes)
-    for unit in ["B", "KB", "MB", "GB"]:
-        if val < 1024.0:
-            return f"{val:.2f} {unit}"
-        val /= 1024.0
-    return f"{val:.2f} TB"
+    """格式化文件大小（由 bit_length 直接定位单位，无需逐级相除）"""
+    idx = min(max((size_bytes.bit_length() - 1) // 10, 0), len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (idx * 10)):.2f} {_SIZE_UNITS[idx]}"
+
+
+_STATS_REPORT_TMPL = "文件统计:\n  预期文件数量: %s\n  实际文件数量: %s"
+_FAILURE_REPORT_TMPL = (
+    "❌ 校验失败: 发现 %s 个失败文件\n"
+    "  失败文件类型统计:\n"
+    "    - 缺失: %s 个\n"
+    "    - 空文件: %s 个\n"
+    "    - 不完整: %s 个"
+    "%s"  # 前十个失败文件名（无失败文件时为空）
+)
 
 
 def print_validation_report(result: ValidationResult) -> None:
-    """显示统计信息与校验结论（原有打印逻辑）"""
-    logger.info("文件统计:")
-    logger.info(f"  预期文件数量: {result.expected_count}")
-    logger.info(f"  实际文件数量: {result.actual_count}")
+    """显示统计信息与校验结论（每段一次 logger 调用，不逐行写出）"""
+    logger.info(_STATS_REPORT_TMPL, result.expected_count, result.actual_count)
 
     if result.is_complete:
         logger.info("✅ 校验通过: 所有文件已完整下载")
     else:
-        total_failed = len(result.failed_files)
-        logger.error(f"❌ 校验失败: 发现 {total_failed} 个失败文件")
-        logger.error("  失败文件类型统计:")
-        logger.error(f"    - 缺失: {len(result.missing_files)} 个")
-        logger.error(f"    - 空文件: {len(result.zero_size_files)} 个")
-        logger.error(f"    - 不完整: {len(result.incomplete_files)} 个")
-
         failed_sorted = result.failed_files
+        lines: list[str] = []
         if failed_sorted:
-            logger.error("  前十个失败的文件名:")
-            for i, filename in enumerate(failed_sorted[:10], 1):
-                logger.error(f"    {i}. {filename}")
+            lines.append("  前十个失败的文件名:")
+            lines.extend(f"    {i}. {name}" for i, name in enumerate(failed_sorted[:10], 1))
             if len(failed_sorted) > 10:
-                logger.error(f"    ... 还有 {len(failed_sorted) - 10} 个失败文件")
+                lines.append(f"    ... 还有 {len(failed_sorted) - 10} 个失败文件")
+        logger.error(
+            _FAILURE_REPORT_TMPL,
+            len(failed_sorted),
+            len(result.missing_files),
+            len(result.zero_size_files),
+            len(result.incomplete_files),
+            "".join(f"\n{line}" for line in lines),
+        )
     logger.info("")
 
 
@@ -352,15 +457,36 @@ def validate_downloads(directory: str) -> tuple[bool, dict]:
 
 def main() -> None:
     """主函数"""
-    if len(sys.argv) < 2:
-        logger.error("用法: python -m m3u8_spider.core.validator <目录路径或视频名>")
-        logger.error(
-            "示例: python -m m3u8_spider.core.validator my_video   # 默认校验 movies/my_video"
-        )
-        logger.error("      python -m m3u8_spider.core.validator ./my_video")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="校验 M3U8 下载目录中的文件是否完整",
+        epilog=(
+            "示例: python -m m3u8_spider.core.validator my_video   # 默认校验 movies/my_video\n"
+            "      python -m m3u8_spider.core.validator ./my_video --json"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("directory", help="目录路径或视频名")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="不打印报告，只向标准输出写一行 JSON 校验结果（字段同 validate_downloads 返回的字典）",
+    )
+    args = parser.parse_args()
+
+    directory = resolve_directory(args.directory)
+    if args.json:
+        # stdout 只留给 JSON：控制台日志改写到 stderr，并先排空日志队列
+        set_console_stream(sys.stderr)
+        validator = DownloadValidator(directory)
+        result = validator.validate()
+        if result is not None:
+            data = result.to_legacy_dict()
+        else:
+            data = {"directory": directory, "is_complete": False, "error": validator.error}
+        shutdown_logging()
+        sys.stdout.write(json_dumps(data) + "\n")
+        sys.exit(0 if result is not None and result.is_complete else 1)
 
-    directory = resolve_directory(sys.argv[1])
     is_complete, _result = validate_downloads(directory)
     sys.exit(0 if is_complete else 1)
 
@@ -7,12 +7,15 @@ MySQL 数据库管理模块
 from __future__ import annotations
 
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from enum import IntEnum
 
 import pymysql
-from pymysql.cursors import DictCursor
+from dbutils.pooled_db import PooledDB
+from pymysql.cursors import Cursor, SSCursor
 
 from m3u8_spider.logger import get_logger
 
@@ -50,6 +53,65 @@ class DownloadTask:
         )
 
 
+# ---------------------------------------------------------------------------
+# SQL
+# ---------------------------------------------------------------------------
+
+_PENDING_TASKS_SQL = """
+    SELECT id, number, m3u8_address, status, title, provider
+    FROM movie_info
+    WHERE status = %s AND m3u8_address IS NOT NULL AND m3u8_address != ''
+    ORDER BY id ASC
+    LIMIT %s
+"""
+
+# 按状态分组计数：借助 idx_status_id 做索引扫描，而非对全表逐行求三个 SUM(CASE ...)
+_STATISTICS_SQL = """
+    SELECT status, COUNT(*) AS cnt
+    FROM movie_info
+    WHERE m3u8_address IS NOT NULL AND m3u8_address != ''
+    GROUP BY status
+"""
+
+_EMPTY_STATISTICS = {"total": 0, "pending": 0, "success": 0, "failed": 0}
+
+# 任务状态 → 统计字典（get_statistics 的返回结构）中的键，调用方本地累加统计时复用
+STATUS_STAT_KEYS = {
+    TaskStatus.PENDING: "pending",
+    TaskStatus.SUCCESS: "success",
+    TaskStatus.FAILED: "failed",
+}
+
+# 守护进程查询所需的索引：(索引名, 列定义)；由 ensure_indexes() 显式迁移创建
+_REQUIRED_INDEXES = (("idx_status_id", "(status, id)"),)
+
+_INDEX_EXISTS_SQL = """
+    SELECT 1 FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'movie_info' AND index_name = %s
+    LIMIT 1
+"""
+
+
+def _rows_to_statistics(rows) -> dict[str, int]:
+    """分组计数结果行 (status, cnt) → {total, pending, success, failed}"""
+    stats = dict(_EMPTY_STATISTICS)
+    for status, count in rows:
+        count = count or 0
+        stats["total"] += count
+        key = STATUS_STAT_KEYS.get(status)
+        if key:
+            stats[key] += count
+    return stats
+
+
+def _rows_to_pending_tasks(rows) -> list[DownloadTask]:
+    """
+    待下载任务查询结果 → DownloadTask 列表
+    元组行按位置解包：SELECT 列顺序与 DownloadTask 字段顺序一致
+    """
+    return [DownloadTask(*row) for row in rows]
+
+
 # ---------------------------------------------------------------------------
 # 数据库管理器
 # ---------------------------------------------------------------------------
@@ -70,6 +132,7 @@ class DatabaseManager:
         connect_timeout: int = 10,
         read_timeout: int = 120,
         write_timeout: int = 120,
+        pool_size: int = 5,
     ) -> None:
         """
         初始化数据库管理器
@@ -85,6 +148,7 @@ class DatabaseManager:
             connect_timeout: 建立 TCP 连接超时（秒），传给 pymysql
             read_timeout: 读超时（秒），避免 UPDATE 等长时间无响应时无限阻塞
             write_timeout: 写超时（秒）
+            pool_size: 连接池最大连接数（并发查询/更新时复用已建立的会话）
         """
         self._config = {
             "host": host,
@@ -93,7 +157,8 @@ class DatabaseManager:
             "password": password,
             "database": database,
             "charset": "utf8mb4",
-            "cursorclass": DictCursor,
+            # 元组游标：行按位置解包，省去每行构建 dict 的开销
+            "cursorclass": Cursor,
             "autocommit": True,
             "connect_timeout": connect_timeout,
             "read_timeout": read_timeout,
@@ -101,28 +166,45 @@ class DatabaseManager:
         }
         self._max_retries = max_retries
         self._retry_delay = retry_delay
-        self._connection: pymysql.Connection | None = None
+        self._pool_size = max(1, pool_size)
+        self._pool: PooledDB | None = None
 
     def connect(self) -> bool:
         """
-        建立数据库连接（带重试机制）
+        建立数据库连接池（带重试机制，预先建立一个连接以验证可用性）
 
         Returns:
             连接成功返回 True，失败返回 False
         """
         for attempt in range(1, self._max_retries + 1):
             try:
-                self._connection = pymysql.connect(**self._config)
+                self._pool = PooledDB(
+                    creator=pymysql,
+                    mincached=1,
+                    maxcached=self._pool_size,
+                    maxconnections=self._pool_size,
+                    blocking=True,
+                    # autocommit 模式下归还连接无需 rollback，省去一次往返
+                    reset=False,
+                    # 取连接时不再 ping（每次查询省一次往返）；
+                    # 陈旧连接在执行时抛出以下异常，由 DBUtils 透明重连并重试一次
+                    ping=0,
+                    failures=(pymysql.OperationalError, pymysql.InterfaceError),
+                    **self._config,
+                )
                 logger.info(
-                    f"✅ 数据库连接成功: {self._config['host']}:{self._config['port']}/{self._config['database']}"
+                    "✅ 数据库连接成功: %s:%s/%s",
+                    self._config["host"],
+                    self._config["port"],
+                    self._config["database"],
                 )
                 return True
             except pymysql.Error as e:
                 logger.error(
-                    f"❌ 数据库连接失败 (尝试 {attempt}/{self._max_retries}): {e}"
+                    "❌ 数据库连接失败 (尝试 %s/%s): %s", attempt, self._max_retries, e
                 )
                 if attempt < self._max_retries:
-                    logger.warning(f"   {self._retry_delay} 秒后重试...")
+                    logger.warning("   %s 秒后重试...", self._retry_delay)
                     time.sleep(self._retry_delay)
                 else:
                     logger.error("   已达到最大重试次数，放弃连接")
@@ -130,32 +212,55 @@ class DatabaseManager:
         return False
 
     def close(self) -> None:
-        """关闭数据库连接"""
-        if self._connection:
+        """关闭连接池及其中所有连接"""
+        if self._pool:
             try:
-                self._connection.close()
+                self._pool.close()
                 logger.info("✅ 数据库连接已关闭")
             except pymysql.Error as e:
-                logger.warning(f"⚠️  关闭数据库连接时出错: {e}")
+                logger.warning("⚠️  关闭数据库连接时出错: %s", e)
             finally:
-                self._connection = None
+                self._pool = None
 
-    def _ensure_connection(self) -> bool:
+    def ensure_indexes(self) -> bool:
         """
-        确保数据库连接可用，若断开则重连
+        一次性迁移：缺失时为 movie_info 创建查询所需索引（需要 ALTER 权限）。
+        已存在则跳过（information_schema 检查）。不在 connect() 中自动执行，
+        由 `m3u8-daemon --ensure-indexes` 显式调用。
 
         Returns:
-            连接可用返回 True，否则返回 False
+            索引均已存在或创建成功返回 True，失败返回 False
         """
-        if not self._connection:
-            return self.connect()
+        try:
+            with self._get_conn() as conn, conn.cursor() as cursor:
+                for index_name, columns in _REQUIRED_INDEXES:
+                    cursor.execute(_INDEX_EXISTS_SQL, (index_name,))
+                    if cursor.fetchone():
+                        continue
+                    logger.info("🛠️  创建索引 movie_info.%s %s ...", index_name, columns)
+                    cursor.execute(
+                        f"ALTER TABLE movie_info ADD INDEX {index_name} {columns}"
+                    )
+        except pymysql.Error as e:
+            logger.error("❌ 创建索引失败: %s", e)
+            return False
+        return True
 
+    @contextmanager
+    def _get_conn(self) -> Iterator[pymysql.Connection]:
+        """
+        从连接池取出一个连接，退出时归还（断线在执行语句失败时由连接池重连重试）
+
+        Raises:
+            pymysql.err.OperationalError: 连接池未建立且重连失败
+        """
+        if not self._pool and not self.connect():
+            raise pymysql.err.OperationalError("数据库连接池不可用")
+        conn = self._pool.connection()
         try:
-            self._connection.ping(reconnect=True)
-            return True
-        except pymysql.Error:
-            logger.warning("⚠️  数据库连接已断开，尝试重连...")
-            return self.connect()
+            yield conn
+        finally:
+            conn.close()
 
     def get_pending_tasks(self, limit: int = 10) -> list[DownloadTask]:
         """
@@ -167,36 +272,37 @@ class DatabaseManager:
         Returns:
             待下载任务列表
         """
-        if not self._ensure_connection() or not self._connection:
+        try:
+            # 非缓冲游标：逐行解码，不在客户端先缓存整个结果集；
+            # 仍在归还连接前读完（不返回惰性生成器），避免长时间下载期间占用连接导致服务端写超时
+            with self._get_conn() as conn, conn.cursor(SSCursor) as cursor:
+                cursor.execute(_PENDING_TASKS_SQL, (TaskStatus.PENDING, limit))
+                return _rows_to_pending_tasks(cursor)
+        except pymysql.Error as e:
+            logger.error("❌ 查询待下载任务失败: %s", e)
             return []
 
+    def fetch_stats_and_pending(
+        self, limit: int = 10
+    ) -> tuple[dict[str, int], list[DownloadTask]]:
+        """
+        在同一个借出的连接上依次执行统计与待下载任务两条查询（只占用一次连接池借还）
+
+        Args:
+            limit: 待下载任务的最大数量
+
+        Returns:
+            (统计字典 {total, pending, success, failed}, 待下载任务列表)
+        """
         try:
-            with self._connection.cursor() as cursor:
-                sql = """
-                    SELECT id, number, m3u8_address, status, title, provider
-                    FROM movie_info
-                    WHERE status = %s AND m3u8_address IS NOT NULL AND m3u8_address != ''
-                    ORDER BY id ASC
-                    LIMIT %s
-                """
-                cursor.execute(sql, (TaskStatus.PENDING, limit))
-                rows = cursor.fetchall()
-
-                tasks = []
-                for row in rows:
-                    task = DownloadTask(
-                        id=row["id"],
-                        number=row["number"],
-                        m3u8_address=row["m3u8_address"],
-                        status=row["status"],
-                        title=row.get("title"),
-                        provider=row.get("provider"),
-                    )
-                    tasks.append(task)
-                return tasks
+            with self._get_conn() as conn, conn.cursor() as cursor:
+                cursor.execute(_STATISTICS_SQL)
+                stats = _rows_to_statistics(cursor.fetchall())
+                cursor.execute(_PENDING_TASKS_SQL, (TaskStatus.PENDING, limit))
+                return stats, _rows_to_pending_tasks(cursor.fetchall())
         except pymysql.Error as e:
-            logger.error(f"❌ 查询待下载任务失败: {e}")
-            return []
+            logger.error("❌ 查询统计与待下载任务失败: %s", e)
+            return dict(_EMPTY_STATISTICS), []
 
     def update_task_status(
         self,
@@ -215,18 +321,15 @@ class DatabaseManager:
         Returns:
             更新成功返回 True，失败返回 False
         """
-        if not self._ensure_connection() or not self._connection:
-            return False
-
         try:
-            with self._connection.cursor() as cursor:
+            with self._get_conn() as conn, conn.cursor() as cursor:
                 if update_m3u8_time:
                     sql = """
                         UPDATE movie_info
-                        SET status = %s, m3u8_update_time = %s
+                        SET status = %s, m3u8_update_time = NOW()
                         WHERE id = %s
                     """
-                    cursor.execute(sql, (status, datetime.now(), task_id))
+                    cursor.execute(sql, (status, task_id))
                 else:
                     sql = """
                         UPDATE movie_info
@@ -237,7 +340,7 @@ class DatabaseManager:
 
                 return cursor.rowcount > 0
         except pymysql.Error as e:
-            logger.error(f"❌ 更新任务状态失败 (ID={task_id}): {e}")
+            logger.error("❌ 更新任务状态失败 (ID=%s): %s", task_id, e)
             return False
 
     def get_task_by_id(self, task_id: int) -> DownloadTask | None:
@@ -250,11 +353,8 @@ class DatabaseManager:
         Returns:
             任务对象，不存在则返回 None
         """
-        if not self._ensure_connection() or not self._connection:
-            return None
-
         try:
-            with self._connection.cursor() as cursor:
+            with self._get_conn() as conn, conn.cursor() as cursor:
                 sql = """
                     SELECT id, number, m3u8_address, status, title, provider
                     FROM movie_info
@@ -262,20 +362,9 @@ class DatabaseManager:
                 """
                 cursor.execute(sql, (task_id,))
                 row = cursor.fetchone()
-
-                if not row:
-                    return None
-
-                return DownloadTask(
-                    id=row["id"],
-                    number=row["number"],
-                    m3u8_address=row["m3u8_address"],
-                    status=row["status"],
-                    title=row.get("title"),
-                    provider=row.get("provider"),
-                )
+                return DownloadTask(*row) if row else None
         except pymysql.Error as e:
-            logger.error(f"❌ 查询任务失败 (ID={task_id}): {e}")
+            logger.error("❌ 查询任务失败 (ID=%s): %s", task_id, e)
             return None
 
     def get_tasks_for_m3u8_refresh(
@@ -293,11 +382,8 @@ class DatabaseManager:
         Returns:
             待刷新任务列表
         """
-        if not self._ensure_connection() or not self._connection:
-            return []
-
         try:
-            with self._connection.cursor() as cursor:
+            with self._get_conn() as conn, conn.cursor() as cursor:
                 sql = """
                     SELECT id, number, m3u8_address, status, title, provider, url, m3u8_update_time
                     FROM movie_info
@@ -308,24 +394,12 @@ class DatabaseManager:
                     LIMIT %s
                 """
                 cursor.execute(sql, (TaskStatus.SUCCESS, min_minutes_since_update, limit))
-                rows = cursor.fetchall()
-
-                tasks = []
-                for row in rows:
-                    task = DownloadTask(
-                        id=row["id"],
-                        number=row["number"],
-                        m3u8_address=row["m3u8_address"] or "",
-                        status=row["status"],
-                        title=row.get("title"),
-                        provider=row.get("provider"),
-                        url=row.get("url"),
-                        m3u8_update_time=row.get("m3u8_update_time"),
-                    )
-                    tasks.append(task)
-                return tasks
+                return [
+                    DownloadTask(task_id, number, m3u8_address or "", *rest)
+                    for task_id, number, m3u8_address, *rest in cursor.fetchall()
+                ]
         except pymysql.Error as e:
-            logger.error(f"❌ 查询 M3U8 刷新任务失败: {e}")
+            logger.error("❌ 查询 M3U8 刷新任务失败: %s", e)
             return []
 
     def update_m3u8_address(self, task_id: int, m3u8_url: str) -> bool:
@@ -339,20 +413,17 @@ class DatabaseManager:
         Returns:
             更新成功返回 True，失败返回 False
         """
-        if not self._ensure_connection() or not self._connection:
-            return False
-
         try:
-            with self._connection.cursor() as cursor:
+            with self._get_conn() as conn, conn.cursor() as cursor:
                 sql = """
                     UPDATE movie_info
-                    SET m3u8_address = %s, m3u8_update_time = %s
+                    SET m3u8_address = %s, m3u8_update_time = NOW()
                     WHERE id = %s
                 """
-                cursor.execute(sql, (m3u8_url, datetime.now(), task_id))
+                cursor.execute(sql, (m3u8_url, task_id))
                 return cursor.rowcount > 0
         except pymysql.Error as e:
-            logger.error(f"❌ 更新 M3U8 地址失败 (ID={task_id}): {e}")
+            logger.error("❌ 更新 M3U8 地址失败 (ID=%s): %s", task_id, e)
             return False
 
     def get_statistics(self) -> dict[str, int]:
@@ -362,32 +433,13 @@ class DatabaseManager:
         Returns:
             统计字典 {total, pending, success, failed}
         """
-        if not self._ensure_connection() or not self._connection:
-            return {"total": 0, "pending": 0, "success": 0, "failed": 0}
-
         try:
-            with self._connection.cursor() as cursor:
-                sql = """
-                    SELECT
-                        COUNT(*) as total,
-                        SUM(CASE WHEN status = %s THEN 1 ELSE 0 END) as pending,
-                        SUM(CASE WHEN status = %s THEN 1 ELSE 0 END) as success,
-                        SUM(CASE WHEN status = %s THEN 1 ELSE 0 END) as failed
-                    FROM movie_info
-                    WHERE m3u8_address IS NOT NULL AND m3u8_address != ''
-                """
-                cursor.execute(sql, (TaskStatus.PENDING, TaskStatus.SUCCESS, TaskStatus.FAILED))
-                row = cursor.fetchone()
-
-                return {
-                    "total": row["total"] or 0,
-                    "pending": row["pending"] or 0,
-                    "success": row["success"] or 0,
-                    "failed": row["failed"] or 0,
-                }
+            with self._get_conn() as conn, conn.cursor() as cursor:
+                cursor.execute(_STATISTICS_SQL)
+                return _rows_to_statistics(cursor.fetchall())
         except pymysql.Error as e:
-            logger.error(f"❌ 获取统计信息失败: {e}")
-            return {"total": 0, "pending": 0, "success": 0, "failed": 0}
+            logger.error("❌ 获取统计信息失败: %s", e)
+            return dict(_EMPTY_STATISTICS)
 
     def __enter__(self) -> DatabaseManager:
         """上下文管理器：进入"""
@@ -6,9 +6,14 @@
 
 from __future__ import annotations
 
+import atexit
+import contextlib
 import logging
 import os
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from m3u8_spider.config import (
@@ -17,6 +22,73 @@ from m3u8_spider.config import (
     LOG_FORMAT,
 )
 
+# ---------------------------------------------------------------------------
+# 后台写日志：所有 logger 共用一个队列与一个监听线程，保证跨模块的输出顺序
+# ---------------------------------------------------------------------------
+
+
+class _RoutedQueueHandler(QueueHandler):
+    """入队时附带该 logger 的目标 handlers，由唯一的监听线程按此分发"""
+
+    def __init__(self, log_queue: queue.SimpleQueue, targets: tuple[logging.Handler, ...]):
+        super().__init__(log_queue)
+        self.targets = targets
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait((self.targets, record))
+
+
+class _RoutingQueueListener(QueueListener):
+    """按入队时附带的 targets 分发日志记录"""
+
+    def handle(self, item) -> None:
+        targets, record = item
+        for handler in targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener = _RoutingQueueListener(_log_queue)
+_listener_lock = threading.Lock()
+_listener_started = False
+# 已接入队列的 logger：shutdown 时改回由 targets 同步输出
+_queued_loggers: list[tuple[logging.Logger, _RoutedQueueHandler]] = []
+_shut_down = False
+
+# 共享的输出 handlers：控制台一个，日志文件按路径各一个
+_formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(_formatter)
+_file_handlers: dict[Path, logging.FileHandler] = {}
+
+
+def _get_file_handler(log_file: str | Path) -> logging.FileHandler:
+    log_path = Path(log_file).resolve()
+    handler = _file_handlers.get(log_path)
+    if handler is None:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(log_path, mode="a", encoding="utf-8")
+        handler.setFormatter(_formatter)
+        _file_handlers[log_path] = handler
+    return handler
+
+
+def _attach_handlers(logger: logging.Logger, targets: tuple[logging.Handler, ...]) -> None:
+    """把 targets 接到 logger 上：正常情况下经共享队列异步输出，shutdown 之后直接同步输出"""
+    global _listener_started
+    with _listener_lock:
+        if _shut_down:
+            for handler in targets:
+                logger.addHandler(handler)
+            return
+        queue_handler = _RoutedQueueHandler(_log_queue, targets)
+        logger.addHandler(queue_handler)
+        _queued_loggers.append((logger, queue_handler))
+        if not _listener_started:
+            _listener.start()
+            _listener_started = True
+
 
 # ---------------------------------------------------------------------------
 # 日志配置函数
@@ -63,29 +135,50 @@ def setup_logger(
 
     logger.setLevel(level)
 
-    # 创建格式化器
-    formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
-
-    # 添加控制台 handler
+    # 实际输出的 handlers 为模块级共享，由后台监听线程驱动，调用方只做入队；
+    # 级别过滤由 logger.setLevel 完成
+    targets: list[logging.Handler] = []
     if console:
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(level)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-
-    # 添加文件 handler
+        targets.append(_console_handler)
     if log_file:
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-
-        file_handler = logging.FileHandler(log_path, mode="a", encoding="utf-8")
-        file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        targets.append(_get_file_handler(log_file))
+    if targets:
+        _attach_handlers(logger, tuple(targets))
 
     return logger
 
 
+def shutdown_logging() -> None:
+    """
+    停止后台日志线程，确保队列中的日志全部写出（可重复调用）。
+    之后的日志改为由共享 handlers 同步输出，不会丢失。
+    """
+    global _shut_down
+    with _listener_lock:
+        if _shut_down:
+            return
+        _shut_down = True
+        if _listener_started:
+            _listener.stop()
+        while _queued_loggers:
+            logger, queue_handler = _queued_loggers.pop()
+            logger.removeHandler(queue_handler)
+            for handler in queue_handler.targets:
+                logger.addHandler(handler)
+
+
+atexit.register(shutdown_logging)
+
+
+def set_console_stream(stream) -> None:
+    """切换控制台日志的输出流（如 --json 模式改写到 stderr，保持 stdout 只有结构化输出）"""
+    with _console_handler.lock:
+        # 原输出流已关闭时无需刷新
+        with contextlib.suppress(ValueError):
+            _console_handler.flush()
+        _console_handler.stream = stream
+
+
 def get_logger(name: str | None = None) -> logging.Logger:
     """
     获取已配置的 logger（如果未配置则使用默认配置）
@@ -4,6 +4,9 @@ from pathlib import Path
 
 from m3u8_spider.config import DEFAULT_BASE_DIR
 
+# 项目根目录，导入时解析一次
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
 
 def resolve_directory(arg: str) -> str:
     """将视频名解析为 movies/<name> 目录，绝对路径或含分隔符则原样返回。"""
@@ -11,5 +14,4 @@ def resolve_directory(arg: str) -> str:
         return arg
     if "/" in arg or "\\" in arg:
         return arg
-    project_root = Path(__file__).resolve().parent.parent.parent
-    return str(project_root / DEFAULT_BASE_DIR / arg)
+    return str(_PROJECT_ROOT / DEFAULT_BASE_DIR / arg)
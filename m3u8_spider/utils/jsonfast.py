@@ -0,0 +1,37 @@
+"""
+JSON 编解码：安装了 orjson 时使用 orjson 加速，否则回退到标准库 json。
+
+可选加速：pip install -e ".[speedups]"
+"""
+
+from __future__ import annotations
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # 直接接受 bytes；orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+    json_loads = orjson.loads
+    json_dumpb = orjson.dumps
+
+    def json_dumps(obj) -> str:
+        """序列化为紧凑的 str（非 ASCII 字符原样保留）。"""
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> str:
+        """序列化为紧凑的 str（非 ASCII 字符原样保留）。"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def json_dumpb(obj) -> bytes:
+        """序列化为紧凑的 UTF-8 bytes。"""
+        return json_dumps(obj).encode("utf-8")
+
+
+__all__ = ["json_dumpb", "json_dumps", "json_loads"]
@@ -7,6 +7,7 @@ M3U8 TS文件合并脚本
 from __future__ import annotations
 
 import json
+import os
 import re
 import subprocess
 import sys
@@ -26,6 +27,9 @@ from m3u8_spider.utils.helpers import resolve_directory
 # 初始化 logger
 logger = get_logger(__name__)
 
+# 项目根目录（mp4 输出目录的基准）
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
 
 # ---------------------------------------------------------------------------
 # 数据模型
@@ -123,10 +127,9 @@ class TSFileCollector:
             logger.error(f"错误: 目录不存在: {directory}")
             return []
 
-        paths = []
-        for p in dir_path.iterdir():
-            if p.suffix == ".ts" and p.is_file():
-                paths.append(str(p))
+        # scandir 的 DirEntry 带 d_type，is_file 不必逐个 stat
+        with os.scandir(dir_path) as entries:
+            paths = [e.path for e in entries if e.name.endswith(".ts") and e.is_file()]
         paths.sort(key=_ts_sort_key)
         return paths
 
@@ -285,8 +288,7 @@ class MP4Merger:
         logger.info(f"{sep}\n")
 
     def _resolve_output_path(self) -> str:
-        project_root = Path(__file__).resolve().parent.parent.parent
-        mp4_dir = project_root / DEFAULT_MP4_DIR
+        mp4_dir = _PROJECT_ROOT / DEFAULT_MP4_DIR
         if not self._output_file:
             dir_name = Path(self._directory.rstrip("/")).name
             return str(mp4_dir / f"{dir_name}.mp4")
@@ -3,18 +3,19 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
-import scrapy
+from __future__ import annotations
 
+from dataclasses import dataclass
 
-class M3U8Item(scrapy.Item):
-    """M3U8下载项"""
 
-    url = scrapy.Field()  # ts文件URL
-    filename = scrapy.Field()  # 保存的文件名
-    directory = scrapy.Field()  # 保存目录
-    segment_index = scrapy.Field()  # 片段索引
-    file_path = scrapy.Field()  # 文件保存的完整路径（由pipeline设置）
-    file_status = (
-        scrapy.Field()
-    )  # 文件下载状态：'downloaded' 或 'failed'（由pipeline设置）
-    file_error = scrapy.Field()  # 文件下载错误信息（由pipeline设置，如果下载失败）
+@dataclass(slots=True)
+class M3U8Item:
+    """M3U8下载项（dataclass item：按位置构造，无 scrapy.Item 的字段字典校验开销）"""
+
+    url: str = ""  # ts文件URL
+    filename: str = ""  # 保存的文件名
+    directory: str = ""  # 保存目录
+    segment_index: int = 0  # 片段索引
+    file_path: str | None = None  # 文件保存的完整路径（由pipeline设置）
+    file_status: str | None = None  # 文件下载状态：'downloaded' 或 'failed'（由pipeline设置）
+    file_error: object | None = None  # 文件下载错误信息（由pipeline设置，如果下载失败）
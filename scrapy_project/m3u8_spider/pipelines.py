@@ -75,20 +75,33 @@ class M3U8FilePipeline(FilesPipeline):
         if hasattr(request, "meta") and "item" in request.meta:
             item = request.meta["item"]
 
-        if item and "filename" in item:
-            filename = item["filename"]
+        if item is not None and item.filename:
+            filename = item.filename
         else:
             # 从URL提取文件名
             url_path = urlparse(request.url).path
             filename = Path(url_path).name or (
-                f"segment_{item.get('segment_index', 0) if item else 0}.ts"
+                f"segment_{item.segment_index if item is not None else 0}.ts"
             )
 
         return filename
 
+    def file_downloaded(self, response, request, info, *, item=None):
+        """
+        将响应体直接写入下载目录。
+
+        跳过父类的 BytesIO 包装、MD5 计算与 getvalue() 再复制：片段只需落盘，
+        校验由 content_lengths.json + validator 完成。未设置下载目录时回退父类实现。
+        """
+        if not self.download_directory:
+            return super().file_downloaded(response, request, info, item=item)
+        path = self.file_path(request, response=response, info=info, item=item)
+        (Path(self.download_directory) / path).write_bytes(response.body)
+        return None  # 不计算 checksum
+
     def get_media_requests(self, item, info):
-        """生成下载请求"""
-        yield Request(item["url"], meta={"item": item})
+        """生成下载请求（片段数据不进入 HTTP 缓存）"""
+        yield Request(item.url, meta={"item": item, "dont_cache": True})
 
     def item_completed(self, results, item, info):
         """文件下载完成后的处理"""
@@ -108,16 +121,11 @@ class M3U8FilePipeline(FilesPipeline):
                 # 注意：FilesPipeline不直接提供response对象，我们需要从其他地方获取
                 # 我们可以在media_downloaded中获取
 
-                # 安全地设置字段（检查字段是否在item定义中）
-                if "file_path" in item.fields:
-                    item["file_path"] = full_path
-                if "file_status" in item.fields:
-                    item["file_status"] = "downloaded"
+                item.file_path = full_path
+                item.file_status = "downloaded"
             else:
-                if "file_status" in item.fields:
-                    item["file_status"] = "failed"
-                if "file_error" in item.fields:
-                    item["file_error"] = result
+                item.file_status = "failed"
+                item.file_error = result
         return item
 
     def media_downloaded(self, response, request, info, *, item=None):
@@ -127,10 +135,10 @@ class M3U8FilePipeline(FilesPipeline):
         if content_length and item:
             try:
                 length = int(content_length.decode("utf-8"))
-                filename = item.get("filename", "")
+                filename = item.filename
                 if filename:
                     self.content_lengths[filename] = length
-            except (ValueError, KeyError):
+            except ValueError:
                 pass
 
         # 调用父类方法继续处理
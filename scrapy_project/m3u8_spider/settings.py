@@ -7,6 +7,9 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import importlib.util
+import os
+
 BOT_NAME = "m3u8_spider"
 
 SPIDER_MODULES = ["m3u8_spider.spiders"]
@@ -26,6 +29,16 @@ DOWNLOAD_DELAY = 0
 CONCURRENT_REQUESTS_PER_DOMAIN = 32
 # CONCURRENT_REQUESTS_PER_IP = 16
 
+# 片段通常来自同一 CDN：DNS 结果缓存、解析/下载超时收紧，失败交给重试与 recovery 补下
+REACTOR_THREADPOOL_MAXSIZE = 40
+DNSCACHE_ENABLED = True
+DNSCACHE_SIZE = 100000
+DNS_TIMEOUT = 5
+DOWNLOAD_TIMEOUT = 30
+RETRY_TIMES = 3
+# 按下载器空闲槽位调度，避免请求堆积在单个已满的域名上
+SCHEDULER_PRIORITY_QUEUE = "scrapy.pqueues.DownloaderAwarePriorityQueue"
+
 # Disable cookies (enabled by default)
 COOKIES_ENABLED = False
 
@@ -39,6 +52,17 @@ DEFAULT_REQUEST_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
 }
 
+# HTTP/2（可选）：设置环境变量 M3U8_HTTP2=1 且已安装 h2（pip install -e ".[http2]"）时，
+# https 片段请求复用同一连接多路复用，省去每个连接的 TCP+TLS 握手。
+# 注意 Scrapy 的 H2 处理器不支持代理（request.meta["proxy"]），因此默认保持 HTTP/1.1。
+if (
+    os.getenv("M3U8_HTTP2", "").strip().lower() in {"1", "true", "yes", "on"}
+    and importlib.util.find_spec("h2") is not None
+):
+    DOWNLOAD_HANDLERS = {
+        "https": "scrapy.core.downloader.handlers.http2.H2DownloadHandler",
+    }
+
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 # SPIDER_MIDDLEWARES = {
@@ -65,7 +89,10 @@ ITEM_PIPELINES = {
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-AUTOTHROTTLE_ENABLED = True
+# 关闭 AutoThrottle：其 START_DELAY 会把片段请求串行化，并发由 CONCURRENT_REQUESTS* 控制。
+# 若 CDN 限流（大量 429/超时），优先调低 --concurrent / CONCURRENT_REQUESTS_PER_DOMAIN
+# 或设置 --delay。
+AUTOTHROTTLE_ENABLED = False
 # The initial download delay
 AUTOTHROTTLE_START_DELAY = 1
 # The maximum download delay to be set in case of high latencies
@@ -78,11 +105,15 @@ AUTOTHROTTLE_DEBUG = False
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-# HTTPCACHE_ENABLED = True
-# HTTPCACHE_EXPIRATION_SECS = 0
-# HTTPCACHE_DIR = "httpcache"
-# HTTPCACHE_IGNORE_HTTP_CODES = []
-# HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# 仅缓存 playlist / 密钥等小响应：按 RFC2616 遵循服务端 Cache-Control，
+# 重复运行同一地址时免去重新请求；
+# TS 片段请求带 dont_cache（见 pipelines.py），不会把视频数据复制进缓存目录。
+HTTPCACHE_ENABLED = True
+HTTPCACHE_POLICY = "scrapy.extensions.httpcache.RFC2616Policy"
+HTTPCACHE_EXPIRATION_SECS = 0
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_IGNORE_HTTP_CODES = [500, 502, 503, 504, 403, 404, 429]
+HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
@@ -4,12 +4,13 @@ M3U8 下载爬虫：下载并解析 M3U8 播放列表，产出 TS 片段与密
 
 from __future__ import annotations
 
+import functools
 import json
+import os
 import re
-from base64 import urlsafe_b64decode
 from dataclasses import dataclass
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlsplit
 
 import m3u8
 import scrapy
@@ -17,6 +18,25 @@ from scrapy.http import Request
 
 from m3u8_spider.items import M3U8Item
 
+# 与 m3u8_spider/utils/jsonfast.py 保持一致：本项目包同名 m3u8_spider，
+# 在 scrapy_project 下运行时无法导入主包，只能在此保留一份
+try:
+    import orjson  # 可选加速：pip install -e ".[speedups]"
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
 
 # ---------------------------------------------------------------------------
 # 常量
@@ -26,13 +46,32 @@ PLAYLIST_FILENAME = "playlist.txt"
 ENCRYPTION_INFO_FILENAME = "encryption_info.json"
 DEFAULT_KEY_FILENAME = "encryption.key"
 
-# 加密检测正则
-KEY_LINE_PATTERN = re.compile(r"#EXT-X-KEY:(.+)")
+
+def _detect_project_root() -> str:
+    """当前项目根目录（main.py 所在层级）：在 scrapy_project 内启动时取其上一级"""
+    current_dir = Path.cwd()
+    if str(current_dir).endswith("scrapy_project"):
+        return str(current_dir.parent)
+    return str(current_dir)
+
+
+# 模块加载时计算一次，避免每次构造爬虫都调用 getcwd
+_PROJECT_ROOT = _detect_project_root()
+
+# 本进程内已确认存在的下载目录（同目录多次构造爬虫时跳过 stat/mkdir）
+_created_dirs: set[str] = set()
+
+# 加密检测正则（模块级预编译；KEY 行按行首锚定，单次 C 层扫描整段文本）
+KEY_LINE_PATTERN = re.compile(r"^#EXT-X-KEY:(.+)$", re.MULTILINE)
 METHOD_PATTERN = re.compile(r"METHOD=([^,\s]+)")
 URI_PATTERN = re.compile(r'URI="([^"]+)"')
 IV_PATTERN = re.compile(r"IV=(0x[0-9A-Fa-f]+)")
 KEYFORMAT_PATTERN = re.compile(r'KEYFORMAT="([^"]+)"')
 KEYFORMATVERSIONS_PATTERN = re.compile(r'KEYFORMATVERSIONS="([^"]+)"')
+# 视为绝对地址、无需解析的 URI 前缀
+_ABSOLUTE_PREFIXES = ("http://", "https://")
+# 表示“未加密”的 METHOD 取值（集合查找，避免逐个 key 调用 upper() 分配新字符串）
+_NONE_METHODS = frozenset({"NONE", "none", "None"})
 
 
 # ---------------------------------------------------------------------------
@@ -83,6 +122,22 @@ class EncryptionInfo:
 # ---------------------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=256)
+def _parse_base(m3u8_url: str) -> tuple[str, str]:
+    """
+    解析 m3u8 地址，返回 (base_url, base_path)。
+
+    base_url 为 scheme://netloc；base_path 为 m3u8 所在目录（根目录时为空串）。
+    同一 CDN 下批量处理多个 URL 时复用解析结果。
+    """
+    parsed = urlparse(m3u8_url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}" if parsed.netloc else ""
+    path = parsed.path
+    # 目录不带结尾斜杠（根目录即空串），便于直接拼接 "{base_url}{base_path}/"
+    base_path = "" if not path or path == "/" else str(Path(path).parent).rstrip("/")
+    return base_url, base_path
+
+
 class UrlResolver:
     """
     将 M3U8 中的相对 URI 解析为绝对 URL。
@@ -91,30 +146,35 @@ class UrlResolver:
 
     def __init__(self, base_url: str, m3u8_path: str) -> None:
         self._base_url = base_url.rstrip("/")
-        parsed_path = urlparse(m3u8_path).path
-        self._base_path = (
-            ""
-            if not parsed_path or parsed_path == "/"
-            else str(Path(parsed_path).parent)
-        )
+        _, self._base_path = _parse_base(m3u8_path)
+        # base 在构造后不变，预先拼好根相对 / 目录相对两种前缀
+        self._root_base = f"{self._base_url}/"
+        self._relative_base = f"{self._base_url}{self._base_path}/"
+        # 根相对路径只保留 scheme://netloc（与 urljoin 语义一致）
+        split = urlsplit(self._root_base)
+        self._origin = f"{split.scheme}://{split.netloc}" if split.netloc else ""
 
     def resolve(self, uri: str) -> str:
         """
         将片段或密钥 URI 转为绝对 URL。
         若已是 http(s) 则原样返回；否则按 / 开头或相对路径拼接。
+        常见的普通相对路径直接字符串拼接；含协议相对（//）、其他 scheme（:）
+        或 ./、../ 的少见情况交给 urljoin 处理。
         """
-        if not uri or uri.startswith("http"):
+        if not uri or uri.startswith(_ABSOLUTE_PREFIXES):
             return uri or ""
 
+        if uri.startswith("//") or ":" in uri or "./" in uri:
+            base = self._root_base if uri.startswith("/") else self._relative_base
+            return urljoin(base, uri)
+
         if uri.startswith("/"):
-            return urljoin(f"{self._base_url}/", uri)
+            return f"{self._origin}{uri}" if self._origin else urljoin(
+                self._root_base, uri
+            )
 
         # 相对于 m3u8 所在目录
-        if self._base_path:
-            base_with_slash = f"{self._base_url}{self._base_path}/"
-        else:
-            base_with_slash = f"{self._base_url}/"
-        return urljoin(base_with_slash, uri)
+        return f"{self._relative_base}{uri}"
 
 
 # ---------------------------------------------------------------------------
@@ -139,20 +199,21 @@ class EncryptionDetector:
         Returns:
             加密信息
         """
-        # 方法1: 使用 m3u8 库的 keys 属性
-        if playlist and hasattr(playlist, "keys") and playlist.keys:
-            info = cls._from_playlist_keys(playlist)
-            if info:
-                return info
+        # 方法1: m3u8 库已解析成功时以 playlist.keys 为准，不再做正则扫描
+        if playlist is not None:
+            return (
+                cls._from_playlist_keys(playlist)
+                or EncryptionInfo.default_unencrypted()
+            )
 
-        # 方法2: 手动解析 #EXT-X-KEY（备用）
+        # 方法2: 手动解析 #EXT-X-KEY（仅用于库解析失败的备用路径）
         return cls._from_content(m3u8_content)
 
     @classmethod
     def _from_playlist_keys(cls, playlist: object) -> EncryptionInfo | None:
         """从 playlist.keys 提取第一个加密密钥信息"""
-        for key in playlist.keys:
-            if not key or not key.method or key.method.upper() == "NONE":
+        for key in getattr(playlist, "keys", None) or ():
+            if not key or not key.method or key.method in _NONE_METHODS:
                 continue
             return EncryptionInfo(
                 is_encrypted=True,
@@ -160,8 +221,8 @@ class EncryptionDetector:
                 key_uri=key.uri,
                 key_file=DEFAULT_KEY_FILENAME,
                 iv=key.iv,
-                keyformat=getattr(key, "keyformat", None),
-                keyformatversions=getattr(key, "keyformatversions", None),
+                keyformat=key.keyformat,
+                keyformatversions=key.keyformatversions,
             )
         return None
 
@@ -176,7 +237,7 @@ class EncryptionDetector:
             if not method_match:
                 continue
             method = method_match.group(1).strip('"')
-            if method.upper() == "NONE":
+            if method in _NONE_METHODS:
                 continue
 
             uri_m = URI_PATTERN.search(key_line)
@@ -213,7 +274,6 @@ class M3U8DownloaderSpider(scrapy.Spider):
     def __init__(
         self,
         m3u8_url: str | None = None,
-        m3u8_url_b64: str | None = None,
         filename: str | None = None,
         download_directory: str | None = None,
         metadata_only: str | bool | None = None,
@@ -223,8 +283,6 @@ class M3U8DownloaderSpider(scrapy.Spider):
         **kwargs,
     ) -> None:
         super().__init__(*args, **kwargs)
-        if not m3u8_url and m3u8_url_b64:
-            m3u8_url = self._decode_b64_url(m3u8_url_b64)
         if not m3u8_url:
             raise ValueError("必须提供m3u8_url参数")
         if not filename:
@@ -241,14 +299,14 @@ class M3U8DownloaderSpider(scrapy.Spider):
             if not path.is_file():
                 raise ValueError(f"retry_urls_file 不存在: {retry_urls_file}")
             try:
-                self._retry_urls = json.loads(path.read_text(encoding="utf-8"))
+                self._retry_urls = _json_loads(path.read_bytes())
             except json.JSONDecodeError as e:
                 raise ValueError(
                     f"retry_urls_file 内容不是合法 JSON: {retry_urls_file}"
                 ) from e
         elif isinstance(retry_urls, str):
             try:
-                self._retry_urls = json.loads(retry_urls)
+                self._retry_urls = _json_loads(retry_urls)
             except (json.JSONDecodeError, TypeError):
                 self.logger.warning(f"无法解析 retry_urls JSON 字符串: {retry_urls}")
                 self._retry_urls = None
@@ -260,12 +318,11 @@ class M3U8DownloaderSpider(scrapy.Spider):
         else:
             project_root = self._project_root()
             self.download_directory = str(Path(project_root) / filename)
-        Path(self.download_directory).mkdir(parents=True, exist_ok=True)
+        self._download_dir_path = Path(self.download_directory)
+        self._ensure_download_dir()
 
-        parsed = urlparse(m3u8_url)
-        self._base_url = f"{parsed.scheme}://{parsed.netloc}"
-        self._base_path = str(Path(parsed.path).parent) or ""
-        self._url_resolver = UrlResolver(self._base_url, parsed.path)
+        base_url, _ = _parse_base(m3u8_url)
+        self._url_resolver = UrlResolver(base_url, m3u8_url)
 
         if self._retry_urls:
             self.logger.info(f"重试模式: 将重新下载 {len(self._retry_urls)} 个文件")
@@ -275,13 +332,19 @@ class M3U8DownloaderSpider(scrapy.Spider):
             self.logger.info(f"M3U8 URL: {self._m3u8_url}")
         self.logger.info(f"下载目录: {self.download_directory}")
 
+    def _ensure_download_dir(self) -> None:
+        """确保下载目录存在；已确认过的目录直接跳过"""
+        directory = self.download_directory
+        if directory in _created_dirs:
+            return
+        if not self._download_dir_path.is_dir():
+            self._download_dir_path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(directory)
+
     @staticmethod
     def _project_root() -> str:
-        """当前项目根目录（main.py 所在层级）"""
-        current_dir = Path.cwd()
-        if str(current_dir).endswith("scrapy_project"):
-            return str(current_dir.parent)
-        return str(current_dir)
+        """当前项目根目录（main.py 所在层级，模块加载时确定）"""
+        return _PROJECT_ROOT
 
     @staticmethod
     def _parse_bool_flag(value: str | bool | None) -> bool:
@@ -293,14 +356,6 @@ class M3U8DownloaderSpider(scrapy.Spider):
         normalized = str(value).strip().lower()
         return normalized in {"1", "true", "yes", "on"}
 
-    def _decode_b64_url(self, value: str) -> str | None:
-        """解码通过命令行传递的 m3u8_url_b64。"""
-        try:
-            return urlsafe_b64decode(value.encode("ascii")).decode("utf-8")
-        except (ValueError, UnicodeDecodeError) as e:
-            self.logger.warning(f"无法解析 m3u8_url_b64: {e}，回退到原始 m3u8_url 参数")
-            return None
-
     def start_requests(self):
         """首轮请求：重试模式直接产出片段项，否则请求 M3U8 地址。"""
         if self._retry_urls:
@@ -313,18 +368,42 @@ class M3U8DownloaderSpider(scrapy.Spider):
             )
 
     def _yield_retry_items(self):
-        """重试模式：按 retry_urls 直接产出 M3U8Item。"""
+        """重试模式：按 retry_urls 直接产出 M3U8Item（同名文件只下载一次）。"""
+        retry_by_name: dict[str, dict] = {}
         for url_info in self._retry_urls:
-            raw_url = url_info["url"]
+            retry_by_name.setdefault(url_info["filename"], url_info)
+        self._discard_stale_files(retry_by_name.keys())
+
+        resolve = self._url_resolver.resolve
+        for url_info in retry_by_name.values():
             # 来自 playlist.txt 的 failed_urls 可能是相对路径，必须解析为绝对 URL
-            if raw_url and not raw_url.startswith(("http://", "https://")):
-                raw_url = self._url_resolver.resolve(raw_url)
-            item = M3U8Item()
-            item["url"] = raw_url
-            item["filename"] = url_info["filename"]
-            item["directory"] = self.download_directory
-            item["segment_index"] = url_info.get("index", 0)
-            yield item
+            yield M3U8Item(
+                resolve(url_info["url"]),
+                url_info["filename"],
+                self.download_directory,
+                url_info.get("index", 0),
+            )
+
+    def _discard_stale_files(self, filenames) -> None:
+        """
+        删除待重试文件在磁盘上的残留（0 字节或不完整）。
+
+        FilesPipeline 会把已存在的文件视为 uptodate 而跳过下载，重试项必须先清除旧文件；
+        一次 scandir 取得目录内已有文件名，避免逐个 stat。
+        """
+        wanted = set(filenames)
+        try:
+            with os.scandir(self.download_directory) as it:
+                stale = [e.path for e in it if e.name in wanted and e.is_file()]
+        except OSError:
+            return
+        for path in stale:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                self.logger.warning(f"无法删除残留文件 {path}: {e}")
+        if stale:
+            self.logger.info(f"已清除 {len(stale)} 个待重试的残留文件")
 
     def parse_m3u8(self, response):
         """解析 M3U8 响应：保存 playlist、检测加密、写出加密信息、按需请求密钥、产出片段项。"""
@@ -346,16 +425,14 @@ class M3U8DownloaderSpider(scrapy.Spider):
 
     def _save_playlist(self, content: str) -> None:
         """将 M3U8 内容保存为 playlist.txt"""
-        path = Path(self.download_directory) / PLAYLIST_FILENAME
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        path = self._download_dir_path / PLAYLIST_FILENAME
+        path.write_text(content, encoding="utf-8")
         self.logger.info(f"M3U8文件已保存到: {path}")
 
     def _save_encryption_info(self, info: EncryptionInfo) -> None:
         """将加密信息写入 encryption_info.json"""
-        path = Path(self.download_directory) / ENCRYPTION_INFO_FILENAME
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(info.to_dict(), f, indent=2, ensure_ascii=False)
+        path = self._download_dir_path / ENCRYPTION_INFO_FILENAME
+        path.write_text(_json_dumps(info.to_dict()), encoding="utf-8")
 
     def _log_encryption(self, info: EncryptionInfo) -> None:
         """根据加密状态打日志"""
@@ -378,35 +455,29 @@ class M3U8DownloaderSpider(scrapy.Spider):
 
     def _save_encryption_key(self, response):
         """保存加密密钥文件"""
-        key_path = Path(self.download_directory) / DEFAULT_KEY_FILENAME
-        with open(key_path, "wb") as f:
-            f.write(response.body)
+        key_path = self._download_dir_path / DEFAULT_KEY_FILENAME
+        key_path.write_bytes(response.body)
         self.logger.info(f"密钥文件已保存到: {key_path}")
 
     def _yield_segment_items_from_playlist(self, playlist):
         """从 m3u8 库的 playlist.segments 产出 M3U8Item。"""
         segments = getattr(playlist, "segments", None) or []
         self.logger.info(f"找到 {len(segments)} 个视频片段")
+        resolve = self._url_resolver.resolve
         for index, segment in enumerate(segments):
-            segment_url = self._url_resolver.resolve(segment.uri)
             filename = self._segment_filename(segment.uri, index)
-            yield self._build_item(segment_url, filename, index)
+            yield self._build_item(resolve(segment.uri), filename, index)
 
     def _segment_filename(self, segment_uri: str, index: int) -> str:
         """根据片段 URI 或索引生成保存文件名"""
-        name = Path(segment_uri).name
+        name = segment_uri.rpartition("/")[2]
         if name and name.endswith(".ts"):
             return name
         return f"segment_{index:05d}.ts"
 
     def _build_item(self, url: str, filename: str, segment_index: int) -> M3U8Item:
         """构造单个 M3U8Item"""
-        item = M3U8Item()
-        item["url"] = url
-        item["filename"] = filename
-        item["directory"] = self.download_directory
-        item["segment_index"] = segment_index
-        return item
+        return M3U8Item(url, filename, self.download_directory, segment_index)
 
     def _parse_m3u8_manual(self, m3u8_content: str):
         """手动解析 M3U8 内容（备用）：加密信息 + 按行解析片段 URL，产出项与密钥请求。"""
@@ -418,18 +489,16 @@ class M3U8DownloaderSpider(scrapy.Spider):
             self.logger.info("元数据补齐模式完成（手动解析），跳过 TS 下载")
             return
 
-        segment_index = 0
-        for line in m3u8_content.strip().split("\n"):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            # 视为片段行（URL）
-            if line.startswith("http"):
-                segment_url = line
-            else:
-                segment_url = self._url_resolver.resolve(line)
-            filename = Path(segment_url).name
+        # 单次 splitlines + 惰性 strip/过滤，非注释行视为片段行（URL）
+        segment_lines = (
+            line
+            for line in filter(None, map(str.strip, m3u8_content.splitlines()))
+            if not line.startswith("#")
+        )
+        resolve = self._url_resolver.resolve
+        for segment_index, line in enumerate(segment_lines):
+            segment_url = resolve(line)
+            filename = segment_url.rpartition("/")[2]
             if not filename or not filename.endswith(".ts"):
                 filename = f"segment_{segment_index:05d}.ts"
             yield self._build_item(segment_url, filename, segment_index)
-            segment_index += 1
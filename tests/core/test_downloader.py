@@ -2,9 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
 import pytest
 
-from m3u8_spider.core.downloader import DownloadConfig
+from m3u8_spider.core import downloader
+from m3u8_spider.core.downloader import (
+    DownloadConfig,
+    kill_running_scrapy,
+    run_scrapy,
+    run_scrapy_async,
+)
 
 
 class TestDownloadConfigPostInit:
@@ -85,3 +97,123 @@ class TestDownloadConfigProperties:
     def test_default_delay_is_zero(self) -> None:
         config = DownloadConfig(m3u8_url="https://example.com/p.m3u8", filename="test")
         assert config.delay == 0.0
+
+
+class TestRunScrapyAsync:
+    """run_scrapy_async() 退出码处理"""
+
+    @staticmethod
+    def _run_with_exit_code(monkeypatch: pytest.MonkeyPatch, code: int) -> None:
+        cmd = [sys.executable, "-c", f"raise SystemExit({code})"]
+        monkeypatch.setattr(downloader, "_prepare_scrapy_command", lambda config: (cmd, "", None))
+        config = DownloadConfig(m3u8_url="https://example.com/p.m3u8", filename="test")
+        asyncio.run(run_scrapy_async(config))
+
+    def test_zero_exit_returns(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self._run_with_exit_code(monkeypatch, 0)
+
+    def test_nonzero_exit_raises(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        with pytest.raises(subprocess.CalledProcessError):
+            self._run_with_exit_code(monkeypatch, 3)
+
+    def test_sync_run_scrapy_delegates(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """run_scrapy 经 asyncio.run 走同一实现，退出码处理一致"""
+        cmd = [sys.executable, "-c", "raise SystemExit(4)"]
+        monkeypatch.setattr(downloader, "_prepare_scrapy_command", lambda config: (cmd, "", None))
+        config = DownloadConfig(m3u8_url="https://example.com/p.m3u8", filename="test")
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            run_scrapy(config)
+        assert exc_info.value.returncode == 4
+
+    def test_overlong_output_line_is_forwarded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """超过单行上限（无换行）的输出分段转发，不抛 ValueError"""
+        script = "import sys; sys.stdout.write('x' * (2 * 1024 * 1024) + '\\ndone\\n')"
+        cmd = [sys.executable, "-c", script]
+        monkeypatch.setattr(downloader, "_prepare_scrapy_command", lambda config: (cmd, "", None))
+        forwarded: list[bytes] = []
+        monkeypatch.setattr(
+            downloader, "_log_output_line", lambda line: forwarded.append(bytes(line))
+        )
+        config = DownloadConfig(
+            m3u8_url="https://example.com/p.m3u8", filename="test", forward_output=True
+        )
+        asyncio.run(run_scrapy_async(config))
+        assert sum(len(line) for line in forwarded[:-1]) == 2 * 1024 * 1024
+        assert forwarded[-1] == b"done"
+
+    def test_child_terminated_when_forwarding_fails(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """转发输出出错时终止并回收子进程，而不是留下孤儿进程"""
+        cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+        monkeypatch.setattr(downloader, "_prepare_scrapy_command", lambda config: (cmd, "", None))
+        procs: list[asyncio.subprocess.Process] = []
+        real_exec = asyncio.create_subprocess_exec
+
+        async def spawn(*args, **kwargs):
+            proc = await real_exec(*args, **kwargs)
+            procs.append(proc)
+            return proc
+
+        async def broken_forward(stream: asyncio.StreamReader) -> None:
+            raise RuntimeError("forward failed")
+
+        monkeypatch.setattr(downloader.asyncio, "create_subprocess_exec", spawn)
+        monkeypatch.setattr(downloader, "_forward_output", broken_forward)
+        config = DownloadConfig(
+            m3u8_url="https://example.com/p.m3u8", filename="test", forward_output=True
+        )
+        with pytest.raises(RuntimeError):
+            asyncio.run(run_scrapy_async(config))
+        assert procs[0].returncode is not None
+
+    def test_console_mode_inherits_stdout(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """单次控制台下载不经管道转发：子进程直接继承终端，Scrapy 日志原样输出"""
+        cmd = [sys.executable, "-c", "pass"]
+        monkeypatch.setattr(downloader, "_prepare_scrapy_command", lambda config: (cmd, "", None))
+        spawn_kwargs: list[dict] = []
+        real_exec = asyncio.create_subprocess_exec
+
+        async def spawn(*args, **kwargs):
+            spawn_kwargs.append(kwargs)
+            return await real_exec(*args, **kwargs)
+
+        monkeypatch.setattr(downloader.asyncio, "create_subprocess_exec", spawn)
+        config = DownloadConfig(m3u8_url="https://example.com/p.m3u8", filename="test")
+        asyncio.run(run_scrapy_async(config))
+        assert spawn_kwargs[0]["stdout"] is None
+        assert spawn_kwargs[0]["stderr"] is None
+
+
+class TestKillRunningScrapy:
+    """kill_running_scrapy() 强制退出"""
+
+    def test_kills_running_child_and_blocks_new_spawns(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+        monkeypatch.setattr(downloader, "_prepare_scrapy_command", lambda config: (cmd, "", None))
+        # 测试结束后恢复，避免影响其他用例
+        monkeypatch.setattr(downloader, "_spawn_blocked", False)
+        config = DownloadConfig(m3u8_url="https://example.com/p.m3u8", filename="test")
+        errors: list[BaseException] = []
+
+        def worker() -> None:
+            try:
+                run_scrapy(config)
+            except subprocess.CalledProcessError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        deadline = time.monotonic() + 10
+        while not downloader._running_procs and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert kill_running_scrapy() == 1
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+        assert len(errors) == 1
+        assert not downloader._running_procs
+
+        # 强制退出后新启动的子进程会被立即终止
+        with pytest.raises(subprocess.CalledProcessError):
+            run_scrapy(config)
@@ -2,7 +2,23 @@
 
 from __future__ import annotations
 
-from m3u8_spider.core.recovery import _build_retry_urls, _extract_failed_urls, _requires_encryption_key
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from m3u8_spider.core import recovery
+from m3u8_spider.core.downloader import DownloadConfig
+from m3u8_spider.core.recovery import (
+    _build_retry_urls,
+    _collect_missing_metadata,
+    _ensure_content_lengths_file,
+    _extract_failed_urls,
+    _load_encryption_info,
+    _requires_encryption_key,
+    prefetch_metadata,
+)
 
 
 class TestRequiresEncryptionKey:
@@ -67,3 +83,76 @@ class TestBuildRetryUrls:
     def test_empty_dict_returns_empty_list(self) -> None:
         result = _build_retry_urls({})
         assert result == []
+
+
+class TestPrefetchMetadata:
+    """prefetch_metadata() 测试"""
+
+    @pytest.fixture
+    def calls(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> list[DownloadConfig]:
+        """将下载目录指向 tmp_path，并记录 run_scrapy 调用"""
+        recorded: list[DownloadConfig] = []
+        monkeypatch.setattr(DownloadConfig, "download_dir", property(lambda self: tmp_path))
+        monkeypatch.setattr(recovery, "run_scrapy", recorded.append)
+        return recorded
+
+    def test_missing_metadata_runs_metadata_only(self, calls: list[DownloadConfig]) -> None:
+        config = DownloadConfig(m3u8_url="https://example.com/a.m3u8", filename="a")
+        assert prefetch_metadata(config) is True
+        assert len(calls) == 1
+        assert calls[0].metadata_only is True
+
+    def test_complete_metadata_skips_download(
+        self, tmp_path: Path, calls: list[DownloadConfig]
+    ) -> None:
+        for name in ("content_lengths.json", "encryption_info.json", "playlist.txt"):
+            (tmp_path / name).write_text("{}", encoding="utf-8")
+        config = DownloadConfig(m3u8_url="https://example.com/a.m3u8", filename="a")
+        assert prefetch_metadata(config) is False
+        assert calls == []
+
+
+class TestLoadEncryptionInfo:
+    """_load_encryption_info() 测试"""
+
+    def test_missing_file_returns_empty(self, tmp_path: Path) -> None:
+        assert _load_encryption_info(tmp_path) == {}
+
+    def test_cache_invalidated_by_mtime(self, tmp_path: Path) -> None:
+        path = tmp_path / "encryption_info.json"
+        path.write_text('{"is_encrypted": false}', encoding="utf-8")
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        first = _load_encryption_info(tmp_path)
+        assert _load_encryption_info(tmp_path) is first
+
+        path.write_text('{"is_encrypted": true}', encoding="utf-8")
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+        assert _load_encryption_info(tmp_path) == {"is_encrypted": True}
+
+
+class TestEnsureContentLengthsFile:
+    """_ensure_content_lengths_file() 测试"""
+
+    def test_creates_empty_json(self, tmp_path: Path) -> None:
+        _ensure_content_lengths_file(tmp_path)
+        assert (tmp_path / "content_lengths.json").read_text(encoding="utf-8") == "{}"
+
+    def test_keeps_existing_content(self, tmp_path: Path) -> None:
+        path = tmp_path / "content_lengths.json"
+        path.write_text('{"segment_00000.ts": 100}', encoding="utf-8")
+        _ensure_content_lengths_file(tmp_path)
+        assert path.read_text(encoding="utf-8") == '{"segment_00000.ts": 100}'
+
+
+class TestCollectMissingMetadata:
+    """_collect_missing_metadata() 测试"""
+
+    def test_encrypted_without_key_reports_key(self, tmp_path: Path) -> None:
+        info = {"is_encrypted": True, "key_uri": "https://key.url"}
+        (tmp_path / "encryption_info.json").write_text(json.dumps(info), encoding="utf-8")
+        assert "encryption.key" in _collect_missing_metadata(tmp_path)
+
+    def test_existing_key_skips_encryption_info(self, tmp_path: Path) -> None:
+        (tmp_path / "encryption.key").write_bytes(b"0123456789abcdef")
+        (tmp_path / "encryption_info.json").write_text("not json", encoding="utf-8")
+        assert "encryption.key" not in _collect_missing_metadata(tmp_path)
@@ -5,6 +5,8 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import pytest
+
 from m3u8_spider.core.validator import (
     ContentLengthLoader,
     DownloadValidator,
@@ -12,6 +14,7 @@ from m3u8_spider.core.validator import (
     ValidationResult,
     _validate_content_length,
     format_size,
+    main,
 )
 
 
@@ -27,6 +30,34 @@ class TestPlaylistParser:
         assert segments[1].expected_filename == "segment_00002.ts"
         assert segments[2].expected_filename == "segment_00003.ts"
 
+    def test_parse_playlist_builds_name_to_url(self, playlist_dir: Path) -> None:
+        parsed = PlaylistParser.parse_playlist(str(playlist_dir / "playlist.txt"))
+        assert len(parsed.segments) == 3
+        assert set(parsed.expected_names) == {
+            "segment_00001.ts",
+            "segment_00002.ts",
+            "segment_00003.ts",
+        }
+        assert parsed.filename_to_url["segment_00002.ts"] == parsed.segments[1].url
+
+    def test_parse_playlist_duplicate_name_keeps_last_url(self, tmp_path: Path) -> None:
+        """同名片段在映射中以后出现的 URL 为准"""
+        playlist = tmp_path / "playlist.txt"
+        playlist.write_text(
+            "#EXTM3U\nhttps://a.example.com/seg.ts\nhttps://b.example.com/seg.ts\n",
+            encoding="utf-8",
+        )
+        parsed = PlaylistParser.parse_playlist(str(playlist))
+        assert len(parsed.segments) == 2
+        assert parsed.filename_to_url == {"seg.ts": "https://b.example.com/seg.ts"}
+
+    def test_parse_across_read_blocks(self, playlist_dir: Path, monkeypatch) -> None:
+        """分块读取时片段序号跨块连续"""
+        monkeypatch.setattr("m3u8_spider.core.validator._PLAYLIST_BLOCK_SIZE", 16)
+        segments = PlaylistParser.parse(str(playlist_dir / "playlist.txt"))
+        assert [seg.index for seg in segments] == [0, 1, 2]
+        assert segments[2].expected_filename == "segment_00003.ts"
+
     def test_parse_relative_urls(self, playlist_dir: Path) -> None:
         """测试不含目录前缀的 URL，此时用 Path.name 取文件名"""
         playlist_path = playlist_dir / "playlist.txt"
@@ -132,6 +163,8 @@ class TestValidationResult:
             incomplete_files=["seg2.ts"],
         )
         assert result.failed_files == ["seg1.ts", "seg2.ts", "seg3.ts"]
+        # 第二次访问直接返回缓存
+        assert result.failed_files is result.failed_files
 
     def test_to_legacy_dict(self) -> None:
         result = ValidationResult(
@@ -245,3 +278,80 @@ class TestDownloadValidator:
         assert result is not None
         assert result.is_complete is False
         assert "segment_00001.ts" in result.incomplete_files
+
+    def test_validate_parallel_stat(
+        self, playlist_dir_with_content_lengths: Path, monkeypatch
+    ) -> None:
+        """强制走线程池 stat 分支，结果与串行一致"""
+        monkeypatch.setattr("m3u8_spider.core.validator._PARALLEL_STAT_MIN_FILES", 0)
+        (playlist_dir_with_content_lengths / "segment_00002.ts").write_text("")
+        validator = DownloadValidator(str(playlist_dir_with_content_lengths))
+        result = validator.validate()
+        assert result is not None
+        assert result.actual_count == 3
+        assert result.zero_size_files == ["segment_00002.ts"]
+
+    def test_validate_statx_dont_sync(
+        self, playlist_dir_with_content_lengths: Path, monkeypatch
+    ) -> None:
+        """statx(AT_STATX_DONT_SYNC) 读取的大小与 os.stat 一致"""
+        from m3u8_spider.core import validator as validator_module
+
+        statx = validator_module._load_statx()
+        if statx is None:
+            pytest.skip("当前平台不支持 statx")
+        monkeypatch.setattr(validator_module, "_statx", statx)
+        (playlist_dir_with_content_lengths / "segment_00001.ts").write_bytes(b"x" * 500)
+        validator = DownloadValidator(str(playlist_dir_with_content_lengths))
+        result = validator.validate()
+        assert result is not None
+        assert result.total_size == 2500
+        assert result.incomplete_files == ["segment_00001.ts"]
+
+    def test_validate_statx_failure_falls_back_to_stat(
+        self, playlist_dir_with_content_lengths: Path, monkeypatch
+    ) -> None:
+        """statx 调用失败（如 EPERM）时回退 os.stat，不把片段误判为空文件"""
+        monkeypatch.setattr("m3u8_spider.core.validator._statx", lambda *args: -1)
+        validator = DownloadValidator(str(playlist_dir_with_content_lengths))
+        result = validator.validate()
+        assert result is not None
+        assert result.zero_size_files == []
+        assert result.total_size == 3000
+
+
+class TestMainJson:
+    """main() --json 输出测试"""
+
+    @pytest.fixture(autouse=True)
+    def _keep_logging(self, monkeypatch):
+        """避免 main() 关闭全局日志线程、改写控制台输出流影响其他测试"""
+        from m3u8_spider import logger as logger_module
+
+        stream = logger_module._console_handler.stream
+        monkeypatch.setattr("m3u8_spider.core.validator.shutdown_logging", lambda: None)
+        yield
+        logger_module.set_console_stream(stream)
+
+    def test_json_output_complete(
+        self, playlist_dir_with_content_lengths: Path, monkeypatch, capsys
+    ) -> None:
+        monkeypatch.setattr(
+            "sys.argv", ["validator", str(playlist_dir_with_content_lengths), "--json"]
+        )
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 0
+        data = json.loads(capsys.readouterr().out)
+        assert data["is_complete"] is True
+        assert data["expected_count"] == 3
+
+    def test_json_error_object_on_missing_directory(self, monkeypatch, capsys) -> None:
+        """目录不存在时 stdout 只有一个带 error 字段的 JSON 对象"""
+        monkeypatch.setattr("sys.argv", ["validator", "/nonexistent/directory", "--json"])
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 1
+        data = json.loads(capsys.readouterr().out)
+        assert data["is_complete"] is False
+        assert "目录不存在" in data["error"]
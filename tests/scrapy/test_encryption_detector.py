@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import m3u8
 from m3u8_spider.spiders.m3u8_downloader import EncryptionDetector, EncryptionInfo
 
 
@@ -87,3 +88,21 @@ class TestEncryptionInfoDefaults:
         assert info.method == "SAMPLE-AES"
         assert info.keyformat == "identity"
         assert info.keyformatversions == "1"
+
+
+class TestEncryptionDetectorWithPlaylist:
+    """EncryptionDetector.detect() 传入 m3u8 库 playlist 时以 keys 为准"""
+
+    def test_encrypted_playlist_keys(self, m3u8_content_encrypted: str) -> None:
+        playlist = m3u8.loads(m3u8_content_encrypted)
+        result = EncryptionDetector.detect(m3u8_content_encrypted, playlist)
+        assert result.is_encrypted is True
+        assert result.key_uri == "https://key.example.com/key"
+
+    def test_unencrypted_playlist_skips_content_scan(
+        self, m3u8_content_simple: str
+    ) -> None:
+        playlist = m3u8.loads(m3u8_content_simple)
+        # 内容参数与 playlist 不一致时，结果仍以 playlist.keys 为准
+        result = EncryptionDetector.detect("#EXT-X-KEY:METHOD=AES-128\n", playlist)
+        assert result.is_encrypted is False
@@ -45,3 +45,23 @@ class TestUrlResolver:
         resolver = UrlResolver("https://example.com/videos", "/playlist.m3u8")
         result = resolver.resolve("seg1.ts")
         assert result == "https://example.com/videos/seg1.ts"
+
+    def test_full_m3u8_url_as_path(self) -> None:
+        resolver = UrlResolver("https://example.com", "https://example.com/a/b/index.m3u8?t=1")
+        assert resolver.resolve("seg1.ts") == "https://example.com/a/b/seg1.ts"
+
+    def test_root_relative_with_base_path_keeps_origin_only(self) -> None:
+        resolver = UrlResolver("https://example.com/videos", "/playlist.m3u8")
+        assert resolver.resolve("/seg1.ts") == "https://example.com/seg1.ts"
+
+    def test_protocol_relative_uri(self) -> None:
+        resolver = UrlResolver("https://example.com", "/videos/playlist.m3u8")
+        assert resolver.resolve("//cdn.example.com/seg1.ts") == "https://cdn.example.com/seg1.ts"
+
+    def test_dot_segments_are_normalized(self) -> None:
+        resolver = UrlResolver("https://example.com", "/videos/hls/playlist.m3u8")
+        assert resolver.resolve("../seg1.ts") == "https://example.com/videos/seg1.ts"
+
+    def test_relative_name_starting_with_http_is_resolved(self) -> None:
+        resolver = UrlResolver("https://example.com", "/videos/playlist.m3u8")
+        assert resolver.resolve("http_seg1.ts") == "https://example.com/videos/http_seg1.ts"
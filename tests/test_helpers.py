@@ -2,8 +2,6 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-
 from m3u8_spider.utils.helpers import resolve_directory
 
 
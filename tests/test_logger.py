@@ -0,0 +1,40 @@
+"""logger 单元测试"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+from m3u8_spider import logger as logger_module
+from m3u8_spider.logger import setup_logger
+
+
+class TestSharedQueueListener:
+    """所有 logger 共用一个队列与监听线程"""
+
+    def test_cross_logger_order_preserved(self, tmp_path: Path) -> None:
+        log_file = tmp_path / "order.log"
+        first = setup_logger("test_logger.first", log_file=log_file, console=False)
+        second = setup_logger("test_logger.second", log_file=log_file, console=False)
+        for i in range(500):
+            first.info("%d", 2 * i)
+            second.info("%d", 2 * i + 1)
+
+        deadline = time.monotonic() + 5
+        lines: list[str] = []
+        while time.monotonic() < deadline:
+            lines = log_file.read_text(encoding="utf-8").splitlines()
+            if len(lines) >= 1000:
+                break
+            time.sleep(0.01)
+        assert [int(line.rsplit(" - ", 1)[1]) for line in lines] == list(range(1000))
+
+    def test_single_listener_thread(self) -> None:
+        setup_logger("test_logger.third", console=False, log_file=None)
+        setup_logger("test_logger.fourth")
+        setup_logger("test_logger.fifth")
+        monitors = [t for t in threading.enumerate() if "_monitor" in t.name]
+        assert len(monitors) == 1
+        assert monitors[0] is logger_module._listener._thread
+        assert monitors[0].is_alive()
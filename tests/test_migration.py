@@ -0,0 +1,155 @@
+"""utils/migration COPY 文本与数组/JSON 转换单元测试"""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from m3u8_spider.utils.migration import (
+    _build_row_transformer,
+    _copy_line,
+    _parse_json_for_pg,
+    _parse_json_or_array,
+    _pg_array_literal,
+    _to_pg_array,
+    _to_pg_json,
+)
+
+
+class TestCopyLine:
+    """_copy_line() COPY text 格式测试"""
+
+    def test_plain_values_tab_separated(self) -> None:
+        assert _copy_line(("a", "b", "c")) == "a\tb\tc\n"
+
+    def test_none_becomes_null_marker(self) -> None:
+        assert _copy_line(("a", None, "c")) == "a\t\\N\tc\n"
+
+    def test_literal_backslash_n_is_not_null(self) -> None:
+        """字符串 "\\N" 的反斜杠被转义，不会被 COPY 读成 NULL"""
+        assert _copy_line(("\\N",)) == "\\\\N\n"
+
+    def test_embedded_tab_and_newlines_escaped(self) -> None:
+        assert _copy_line(("a\tb", "line1\nline2", "x\ry")) == "a\\tb\tline1\\nline2\tx\\ry\n"
+
+    def test_backslash_escaped(self) -> None:
+        assert _copy_line(("C:\\path",)) == "C:\\\\path\n"
+
+    def test_non_string_values_stringified(self) -> None:
+        assert _copy_line((1, 2.5, True)) == "1\t2.5\tTrue\n"
+
+    def test_empty_string_is_not_null(self) -> None:
+        assert _copy_line(("", None)) == "\t\\N\n"
+
+
+class TestPgArrayLiteral:
+    """_pg_array_literal() 数组字面量测试"""
+
+    def test_elements_always_quoted(self) -> None:
+        assert _pg_array_literal(["a", "b"]) == '{"a","b"}'
+
+    def test_empty_list(self) -> None:
+        assert _pg_array_literal([]) == "{}"
+
+    def test_quotes_and_backslashes_escaped(self) -> None:
+        assert _pg_array_literal(['say "hi"', "a\\b"]) == '{"say \\"hi\\"","a\\\\b"}'
+
+    def test_braces_and_commas_stay_inside_quotes(self) -> None:
+        assert _pg_array_literal(["{x}", "a,b"]) == '{"{x}","a,b"}'
+
+    def test_non_string_elements_stringified(self) -> None:
+        assert _pg_array_literal([1, 2]) == '{"1","2"}'
+
+
+class TestParseJsonOrArray:
+    """_parse_json_or_array() 测试"""
+
+    def test_none_and_empty_return_none(self) -> None:
+        assert _parse_json_or_array(None) is None
+        assert _parse_json_or_array("") is None
+
+    def test_json_list(self) -> None:
+        assert _parse_json_or_array('["a", "b"]') == ["a", "b"]
+
+    def test_json_list_non_string_items_stringified(self) -> None:
+        assert _parse_json_or_array("[1, 2]") == ["1", "2"]
+
+    def test_json_scalar_string_wrapped(self) -> None:
+        assert _parse_json_or_array('"abc"') == ["abc"]
+
+    def test_leading_whitespace_before_json(self) -> None:
+        assert _parse_json_or_array('  ["a"]') == ["a"]
+
+    def test_comma_separated(self) -> None:
+        assert _parse_json_or_array("a, b ,c") == ["a", "b", "c"]
+
+    def test_invalid_json_prefix_falls_back_to_comma_split(self) -> None:
+        assert _parse_json_or_array("[a, b") == ["[a", "b"]
+
+    def test_only_separators_returns_none(self) -> None:
+        assert _parse_json_or_array(" , ,") is None
+
+
+class TestToPgArray:
+    """_to_pg_array() 测试"""
+
+    def test_json_string_to_literal(self) -> None:
+        assert _to_pg_array('["x", "y"]') == '{"x","y"}'
+
+    def test_list_value_used_directly(self) -> None:
+        assert _to_pg_array(["x"]) == '{"x"}'
+
+    def test_scalar_value_wrapped(self) -> None:
+        assert _to_pg_array(5) == '{"5"}'
+
+    def test_empty_string_is_null(self) -> None:
+        assert _to_pg_array("") is None
+
+    def test_array_literal_through_copy_line(self) -> None:
+        """数组字面量的转义与 COPY 转义叠加：反斜杠先按数组规则、再按 COPY 规则翻倍"""
+        literal = _to_pg_array(["a\\b", 'q"t', "tab\there"])
+        assert literal == '{"a\\\\b","q\\"t","tab\there"}'
+        assert _copy_line((literal,)) == '{"a\\\\\\\\b","q\\\\"t","tab\\there"}\n'
+
+
+class TestParseJsonForPg:
+    """_parse_json_for_pg() / _to_pg_json() 测试"""
+
+    def test_valid_json_passed_through(self) -> None:
+        assert _parse_json_for_pg('{"a": 1}') == '{"a": 1}'
+
+    def test_invalid_json_stored_as_json_string(self) -> None:
+        assert _parse_json_for_pg("not json") == '"not json"'
+
+    def test_empty_is_null(self) -> None:
+        assert _parse_json_for_pg("") is None
+        assert _parse_json_for_pg(None) is None
+
+    def test_non_string_serialized(self) -> None:
+        assert _to_pg_json({"k": ["v"]}) == '{"k":["v"]}'
+
+    def test_non_ascii_kept(self) -> None:
+        assert _to_pg_json("中文") == '"中文"'
+
+
+class TestBuildRowTransformer:
+    """_build_row_transformer() 测试"""
+
+    def test_selects_and_reorders_columns(self) -> None:
+        transform = _build_row_transformer([2, 0], [None, None])
+        assert transform(("a", "b", "c")) == ("c", "a")
+
+    def test_single_column_returns_tuple(self) -> None:
+        transform = _build_row_transformer([1], [None])
+        assert transform(("a", "b")) == ("b",)
+
+    def test_converters_skip_none(self) -> None:
+        transform = _build_row_transformer([0, 1], [_to_pg_array, None])
+        assert transform(("a,b", "x")) == ('{"a","b"}', "x")
+        assert transform((None, "x")) == (None, "x")
+
+    def test_transformed_row_to_copy_line(self) -> None:
+        transform = _build_row_transformer([0, 1, 2], [None, _to_pg_array, _to_pg_json])
+        row = ("id\t1", '["a"]', None)
+        assert _copy_line(transform(row)) == 'id\\t1\t{"a"}\t\\N\n'